@@ -2,19 +2,24 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import os
+import sys
 import joblib
 from math import sqrt
-import cvxpy as cp
 from datetime import datetime, timedelta
 
-from sklearn.model_selection import RandomizedSearchCV, train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.impute import SimpleImputer
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
 
+# ride model and staffing modules live next to their analysis scripts
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "demand_prediction", "USS_rides_wait_time_prediction", "python_scripts"))
+sys.path.insert(0, os.path.join(current_dir, "resource_optimisation_analysis"))
+from feature_store import load_ride_features
+from model_registry import load_or_train, model_dir
+from ride_estimators import BACKENDS, DEFAULT_BACKEND, build_preprocessor, fit_ride_estimator
+from ride_forecaster import forecast_day
+from staffing_problem import solve_staffing, solve_shift_roster
+
 def add_custom_css():
     st.markdown(
         """
@@ -49,148 +54,63 @@ def add_custom_css():
 
 def optimise_staffing(hourly_demand, total_staff, wait_priority, shift_hours):
     T = len(hourly_demand)
-    S = cp.Variable(T, nonneg=True)
-
     forecast = hourly_demand["forecasted_wait_time"].values
-    mx = np.max(forecast) if np.max(forecast)!=0 else 1
-    demand_weights = forecast / mx
-    target = total_staff * demand_weights
-
-    c = 1
-    u = wait_priority * 10
-    v = 5
+    # compiled once per horizon length and re-solved with warm start across reruns
+    status, allocation = solve_staffing(forecast, total_staff, wait_priority, shift_hours)
 
-    under_alloc = cp.sum(cp.square(cp.pos(target - S)))
-    over_alloc  = cp.sum(cp.square(cp.pos(S - target)))
-    smoothness  = cp.norm(S[1:] - S[:-1], p=2)
-
-    objective = cp.Minimize(
-        c * cp.sum(S) + u * under_alloc + v * over_alloc + 0.1 * smoothness
-    )
-    min_staff = max(10, total_staff // T)
-    constraints = [
-        S >= min_staff,
-        S <= total_staff,
-        cp.sum(S) <= total_staff * shift_hours
-    ]
-    problem = cp.Problem(objective, constraints)
-    result = problem.solve()
-
-    if problem.status != "optimal":
+    if status != "optimal":
         st.warning("Warning: Staff solver not optimal; using uniform fallback.")
         fallback = np.full(T, total_staff // T, dtype=int)
-        return {"status": problem.status, "staff_allocation": fallback}
-    return {"status": problem.status, "staff_allocation": S.value}
-
-def train_ride_model(ride_name):
-    ride_data_path     = f"data/uss_ride_wait_times/merged_{ride_name}.csv"
-    weather_data_path  = "data/Meteorological/datasets/final_data/24_hr_weather_forecast_data.csv"
-    school_hols_path   = "data/Events/Holidays/datasets/daily_school_holidays_combined_updated.csv"
-    event_data_path    = "data/Events/EventData/supplementary_event_data_2016_2025.csv"
-    rainfall_data_path = "data/Meteorological/datasets/final_data/sentosa_rainfall_5min_int.csv"
-
-    st.write(f"**Training Ride Model**: {ride_name}")
-    df_ride = pd.read_csv(ride_data_path)
-    df_ride = df_ride[df_ride["Date/Time"]!="Date/Time"]
-    df_ride.rename(columns={"Date/Time": "datetime", "Wait Time": "wait_time"}, inplace=True)
-    df_ride["wait_time"] = pd.to_numeric(df_ride["wait_time"], errors="coerce")
-    df_ride.dropna(subset=["wait_time"], inplace=True)
-    df_ride["datetime"] = pd.to_datetime(df_ride["datetime"], errors="coerce")
-    df_ride.dropna(subset=["datetime"], inplace=True)
-    if "Ride" in df_ride.columns:
-        df_ride.drop(columns=["Ride"], inplace=True)
-    if df_ride["datetime"].dtype == "datetime64[ns, UTC+08:00]":
-        df_ride["datetime"] = df_ride["datetime"].dt.tz_localize(None)
-
-    # Weather
-    df_weather = pd.read_csv(weather_data_path)
-    df_weather["valid_start"] = pd.to_datetime(df_weather["valid_start"], errors="coerce")
-    df_weather.dropna(subset=["valid_start"], inplace=True)
-    df_weather.rename(columns={"valid_start":"datetime"}, inplace=True)
-    if "valid_end" in df_weather.columns:
-        df_weather.drop(columns=["valid_end"], inplace=True, errors="ignore")
-    if df_weather["datetime"].dtype == "datetime64[ns, UTC+08:00]":
-        df_weather["datetime"] = df_weather["datetime"].dt.tz_localize(None)
-
-    # Rain
-    df_rain = pd.read_csv(rainfall_data_path)
-    df_rain.rename(columns={"timestamp": "datetime"}, inplace=True)
-    df_rain["datetime"] = pd.to_datetime(df_rain["datetime"], errors="coerce")
-    df_rain.dropna(subset=["datetime"], inplace=True)
-    df_rain = df_rain[["datetime","rainfall"]]
-    if df_rain["datetime"].dtype == "datetime64[ns, UTC+08:00]":
-        df_rain["datetime"] = df_rain["datetime"].dt.tz_localize(None)
-
-    # School hol
-    df_school = pd.read_csv(school_hols_path)
-    df_school["date"] = pd.to_datetime(df_school["date"], format="%d/%m/%Y", errors="coerce").dt.date
-
-    # Events
-    df_events = pd.read_csv(event_data_path)
-    if "Date" in df_events.columns:
-        df_events.rename(columns={"Date": "date"}, inplace=True)
-    df_events["date"] = pd.to_datetime(df_events["date"], errors="coerce").dt.date
-
-    # Merge
-    df_ride_weather = pd.merge(df_ride, df_weather, on="datetime", how="left")
-    df_ride_weather = pd.merge(df_ride_weather, df_rain, on="datetime", how="left")
-    df_ride_weather["date"] = df_ride_weather["datetime"].dt.date
-    df_ride_weather = df_ride_weather.merge(df_school[["date","holiday_flag"]], on="date", how="left")
-    df_ride_weather["holiday_flag"] = df_ride_weather["holiday_flag"].fillna(0)
-    merge_cols = [c for c in df_events.columns if c != "date"]
-    df_ride_weather = df_ride_weather.merge(df_events[["date"]+merge_cols], on="date", how="left")
-
-    df_ride_weather.sort_values("datetime", inplace=True)
-    df_ride_weather["wait_time_lag1"] = df_ride_weather["wait_time"].shift(1)
-    df_ride_weather["wait_time_lag2"] = df_ride_weather["wait_time"].shift(2)
-    df_ride_weather["wait_time_rolling3"] = df_ride_weather["wait_time"].rolling(3).mean()
-    df_ride_weather["wait_time_rolling6"] = df_ride_weather["wait_time"].rolling(6).mean()
-    df_ride_weather.fillna(0, inplace=True)
+        return {"status": status, "staff_allocation": fallback}
+    return {"status": status, "staff_allocation": allocation}
+
+def optimise_roster(hourly_demand, total_staff, wait_priority, shift_hours):
+    # integer staff per shift start (MILP); falls back to the continuous allocation
+    forecast = hourly_demand["forecasted_wait_time"].values
+    status, shift_staff, starts, coverage = solve_shift_roster(
+        forecast, np.zeros(len(forecast)), total_staff, wait_priority, shift_hours
+    )
+    if shift_staff is None:
+        st.warning("Warning: No integer roster found in time; using the continuous allocation.")
+        res = optimise_staffing(hourly_demand, total_staff, wait_priority, shift_hours)
+        res["shifts"] = None
+        return res
+    used = shift_staff > 0
+    hours = hourly_demand["hour"].to_numpy()
+    shifts = pd.DataFrame({
+        "Shift Start": hours[starts[used]],
+        "Shift End": hours[starts[used]] + coverage[:, used].sum(axis=0).astype(int),
+        "Staff": shift_staff[used]
+    })
+    return {"status": status, "staff_allocation": coverage @ shift_staff, "shifts": shifts}
+
+# the app's original, smaller gb search (the CLI scripts search n_estimators up to 500)
+APP_PARAM_GRIDS = {
+    "gb": {
+        "n_estimators": [50, 200],
+        "learning_rate":[0.05, 0.1],
+        "max_depth": [3, 5],
+        "min_samples_split":[2,5]
+    }
+}
+
+def train_ride_model(ride_name, backend=DEFAULT_BACKEND):
+    st.write(f"**Training Ride Model**: {ride_name} ({backend})")
+    df_ride_weather = load_ride_features(ride_name)
 
     target = "wait_time"
-    for c in df_ride_weather.columns:
-        if df_ride_weather[c].dtype in [np.float64, np.int64]:
-            df_ride_weather[c] = df_ride_weather[c].fillna(0)
-        elif df_ride_weather[c].dtype == object:
-            df_ride_weather[c] = df_ride_weather[c].fillna("missing")
 
     exclude = ["datetime", "date", "valid_end", target]
     X = df_ride_weather.drop(columns=[c for c in exclude if c in df_ride_weather.columns], errors="ignore")
     y = df_ride_weather[target]
 
-    cat_cols = []
-    if "wind_direction" in X.columns and X["wind_direction"].dtype == object:
-        cat_cols.append("wind_direction")
-    numeric_cols = [c for c in X.columns if c not in cat_cols and (X[c].dtype in [np.float64, np.int64])]
-
-    numeric_transformer = Pipeline([
-        ("imp", SimpleImputer(strategy="mean")),
-        ("scaler", StandardScaler())
-    ])
-    cat_transformer = Pipeline([
-        ("imp", SimpleImputer(strategy="constant", fill_value="missing")),
-        ("ohe", OneHotEncoder(handle_unknown="ignore"))
-    ])
-
-    preprocessor = ColumnTransformer([
-        ("num", numeric_transformer, numeric_cols),
-        ("cat", cat_transformer, cat_cols)
-    ], remainder="drop")
-
+    preprocessor, _, _ = build_preprocessor(X)
     X_processed = preprocessor.fit_transform(X)
     X_train, X_test, y_train, y_test = train_test_split(
         X_processed, y, test_size=0.2, shuffle=False
     )
 
-    param_grid = {
-        "n_estimators": [50, 200],
-        "learning_rate":[0.05, 0.1],
-        "max_depth": [3, 5],
-        "min_samples_split":[2,5]
-    }
-    gb = GradientBoostingRegressor(random_state=42)
-    rs = RandomizedSearchCV(gb, param_grid, n_iter=5, cv=3, scoring="neg_mean_squared_error", random_state=42, n_jobs=-1)
-    rs.fit(X_train, y_train)
+    rs = fit_ride_estimator(X_train, y_train, backend=backend, param_grid=APP_PARAM_GRIDS.get(backend))
     best_model = rs.best_estimator_
 
     y_train_pred = best_model.predict(X_train)
@@ -203,40 +123,93 @@ def train_ride_model(ride_name):
     st.write(f"**Trained Ride**: {ride_name}")
 
     # Save
-    subfolder = f"../models/{ride_name}_gb_model"
+    subfolder = model_dir(ride_name)
     os.makedirs(subfolder, exist_ok=True)
     model_path = f"{subfolder}/best_{ride_name}_gb_model.pkl"
     joblib.dump(best_model, model_path)
 
-    return best_model, preprocessor, df_ride_weather
+    metrics = {"Backend": backend, "Best Params": rs.best_params_,
+               "Train RMSE": train_rmse, "Test RMSE": test_rmse, "Train R2": train_r2, "Test R2": test_r2}
+    return best_model, preprocessor, df_ride_weather, metrics
+
+def load_ride_model(ride_name, backend=DEFAULT_BACKEND):
+    """
+    Load the registered model for a ride, retraining only if its input data or backend changed.
+    """
+    def train(name):
+        model, preproc, _, metrics = train_ride_model(name, backend)
+        return model, preproc, metrics
 
-def predict_5min_for_date(model, preproc, df_data, date):
+    bundle, trained = load_or_train(ride_name, train, backend)
+    if not trained:
+        st.write(f"**Loaded Saved Model**: {ride_name} (training data unchanged)")
+    return bundle["model"], bundle["preprocessor"], load_ride_features(ride_name)
+
+def build_day_index(df_data):
+    """
+    Map each day to its row slice in the datetime-sorted feature frame, so a day's
+    readings are found with a dict lookup instead of normalising the whole column.
+    """
+    days = df_data["datetime"].dt.normalize().to_numpy()
+    uniq, starts = np.unique(days, return_index=True)
+    ends = np.append(starts[1:], len(days))
+    return {pd.Timestamp(d): slice(s, e) for d, s, e in zip(uniq, starts, ends)}
+
+def rows_for_day(df_data, day_index, date_obj):
+    day_slice = day_index.get(date_obj)
+    if day_slice is None:
+        return df_data.iloc[0:0]
+    return df_data.iloc[day_slice]
+
+def predict_5min_for_date(model, preproc, df_data, date, day_index=None, memo=None):
+    """
+    Predict every 5-minute reading of a day. `memo` (day -> predictions) caches results
+    across Streamlit reruns; callers get a copy they can modify.
+    """
     date_obj = pd.to_datetime(date, errors="coerce").normalize()
-    daydf = df_data[df_data["datetime"].dt.normalize()==date_obj].copy()
-    if daydf.empty:
+    if pd.isna(date_obj):
         return None
-    if "wait_time" in daydf.columns:
-        daydf.drop(columns=["wait_time"], inplace=True, errors="ignore")
+    if memo is not None and date_obj in memo:
+        cached = memo[date_obj]
+        return None if cached is None else cached.copy()
 
-    exclude = ["datetime","date","valid_end"]
-    X_day = daydf.drop(columns=[c for c in exclude if c in daydf.columns], errors="ignore")
-    X_proc = preproc.transform(X_day)
-    daydf["PredictedWait"] = model.predict(X_proc)
-    return daydf
+    if day_index is None:
+        day_index = build_day_index(df_data)
+    daydf = rows_for_day(df_data, day_index, date_obj).copy()
+    if daydf.empty:
+        # future day => roll the lag features forward from the last observed readings
+        if date_obj <= df_data["datetime"].iloc[-1].normalize():
+            daydf = None
+        else:
+            daydf = forecast_day({"ride": (model, preproc, df_data)}, date_obj)
+    else:
+        if "wait_time" in daydf.columns:
+            daydf.drop(columns=["wait_time"], inplace=True, errors="ignore")
+
+        exclude = ["datetime","date","valid_end"]
+        X_day = daydf.drop(columns=[c for c in exclude if c in daydf.columns], errors="ignore")
+        X_proc = preproc.transform(X_day)
+        daydf["PredictedWait"] = model.predict(X_proc)
 
-def suggested_percent_change(df_data, model, preproc, day_to_forecast):
+    if memo is not None:
+        memo[date_obj] = daydf
+    return None if daydf is None else daydf.copy()
+
+def suggested_percent_change(df_data, model, preproc, day_to_forecast, day_index=None, memo=None):
     """
     Compare yesterday vs day before, if holiday => +10.
     """
     date_obj = pd.to_datetime(day_to_forecast, errors="coerce").normalize()
     if pd.isna(date_obj):
         return 0
+    if day_index is None:
+        day_index = build_day_index(df_data)
 
     yester = date_obj - timedelta(days=1)
     dayb4  = date_obj - timedelta(days=2)
 
-    yest_pred = predict_5min_for_date(model, preproc, df_data, str(yester))
-    dayb4_pred= predict_5min_for_date(model, preproc, df_data, str(dayb4))
+    yest_pred = predict_5min_for_date(model, preproc, df_data, str(yester), day_index, memo)
+    dayb4_pred= predict_5min_for_date(model, preproc, df_data, str(dayb4), day_index, memo)
 
     if (yest_pred is None or yest_pred.empty) or (dayb4_pred is None or dayb4_pred.empty):
         base = 0
@@ -249,7 +222,7 @@ def suggested_percent_change(df_data, model, preproc, day_to_forecast):
             base=((ya - db)/db)*100.0
 
     # check if forecast day is holiday => add 10
-    daydf = df_data[df_data["datetime"].dt.normalize()==date_obj]
+    daydf = rows_for_day(df_data, day_index, date_obj)
     if not daydf.empty:
         if daydf["holiday_flag"].fillna(0).max()>0:
             base+=10
@@ -281,12 +254,16 @@ def main():
     ride_choice = st.selectbox("Select Ride", ridedf["ride"].unique())
     row = ridedf[ridedf["ride"]==ride_choice].iloc[0]
     ride_file = row["file_name"]  # if KeyError => csv is missing 'file_name'
+    backend = st.selectbox("Model Backend (gb=Gradient Boosting, hgb=Histogram GB, xgb=XGBoost hist)",
+                           BACKENDS, index=BACKENDS.index(DEFAULT_BACKEND))
 
     if st.button("Train Model for This Ride"):
-        model, preproc, df_data = train_ride_model(ride_file)
+        model, preproc, df_data = load_ride_model(ride_file, backend)
         st.session_state["model"] = model
         st.session_state["preproc"] = preproc
         st.session_state["df_data"] = df_data
+        st.session_state["day_index"] = build_day_index(df_data)
+        st.session_state["day_preds"] = {}  # per-day prediction memo, reset with each model
         st.session_state["ride_name"] = ride_choice
 
     if "model" in st.session_state:
@@ -303,7 +280,9 @@ def main():
             st.session_state["df_data"],
             st.session_state["model"],
             st.session_state["preproc"],
-            str(day_choice)
+            str(day_choice),
+            st.session_state["day_index"],
+            st.session_state["day_preds"]
         )
         st.write(f"**Suggested Demand Change**: {rec_pct}% (based on day-1 vs day-2 + holiday)")
 
@@ -314,6 +293,8 @@ def main():
         float(rec_pct) # ensure value is float
         )
 
+        use_roster = st.checkbox("Integer shift roster", value=False)
+
         if open_hour>=close_hour:
             st.error("Open hour must be < close hour.")
         else:
@@ -322,7 +303,9 @@ def main():
                     st.session_state["model"],
                     st.session_state["preproc"],
                     st.session_state["df_data"],
-                    str(day_choice)
+                    str(day_choice),
+                    st.session_state["day_index"],
+                    st.session_state["day_preds"]
                 )
                 if daydf is None or daydf.empty:
                     st.warning("No 5-min data found for that date.")
@@ -334,7 +317,10 @@ def main():
                     hr_g= slice_df.groupby("hour")["PredictedWait"].mean().reset_index()
                     hr_g.rename(columns={"PredictedWait":"forecasted_wait_time"}, inplace=True)
 
-                    res= optimise_staffing(hr_g, staff, wait_prior, shift_hrs)
+                    if use_roster:
+                        res= optimise_roster(hr_g, staff, wait_prior, shift_hrs)
+                    else:
+                        res= optimise_staffing(hr_g, staff, wait_prior, shift_hrs)
                     st.write(f"**Staff Allocation** - {st.session_state['ride_name']}, {day_choice}")
                     st.write(f"Solver status: {res['status']}")
                     if res["status"]!="optimal":
@@ -349,6 +335,9 @@ def main():
                             "StaffAlloc": round(staffarr[i])
                         })
                     st.dataframe(pd.DataFrame(out_rows))
+                    if res.get("shifts") is not None:
+                        st.write("**Shift Roster**")
+                        st.dataframe(res["shifts"])
     else:
         st.info("Train a ride model first to enable predictions.")
 
@@ -1,7 +1,9 @@
 import ast
 import pandas as pd
 import os
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "sentiment_analysis"))
+from sentiment_scorer import compound_scores
 
 base_dir = os.path.abspath(os.path.join(os.getcwd(), "data/Instagram/Data"))
 
@@ -11,7 +13,7 @@ def compute_post_engagement(df):
 
     This function performs the following operations:
     1. Calculates the number of comments for each post.
-    2. Computes the average sentiment score of the comments using the VADER SentimentIntensityAnalyzer.
+    2. Computes the average sentiment score of the comments using VADER, scoring every comment in one cached batch.
     3. Calculates an engagement score for each post based on the number of likes, comments, and sentiment score, using predefined weights.
     4. Saves the updated DataFrame, including the engagement metrics, to a CSV file.
 
@@ -26,16 +28,15 @@ def compute_post_engagement(df):
             - `sentiment`: The average sentiment score of comments for each post.
             - `engagement_score`: The computed engagement score for each post."
     """
-    def compute_avg_sentiment(comments):
-        comments = ast.literal_eval(comments)
-        analyser = SentimentIntensityAnalyzer()
-        if not comments:
-            return 0
-        sentiments = [analyser.polarity_scores(comment)['compound'] for comment in comments.values()]
-        return sum(sentiments) / len(sentiments)
-    
-    df['num_comments'] = df['comments'].apply(lambda post_comments: len(ast.literal_eval(post_comments)))
-    df['sentiment'] = df['comments'].apply(compute_avg_sentiment)
+    post_comments = [list(ast.literal_eval(comments).values()) for comments in df['comments']]
+
+    # score every comment in one batch, then average per post (0 for posts without comments);
+    # each user's comments are a list, scored as one text as before
+    scores = iter(compound_scores([c for comments in post_comments for c in comments], backend="vaderSentiment"))
+    sentiments = [[next(scores) for _ in comments] for comments in post_comments]
+
+    df['num_comments'] = [len(comments) for comments in post_comments]
+    df['sentiment'] = [sum(s) / len(s) if s else 0 for s in sentiments]
 
     # Define weights for engagement score
     alpha = 1  # Weight for likes
@@ -0,0 +1,136 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+
+# Shared fetcher for the per-date data.gov.sg endpoints (rainfall, four-day outlook, ...).
+# Dates are fetched on a bounded thread pool behind a token-bucket rate limiter, failed
+# requests are retried with exponential backoff, and every successful response is cached
+# as one JSON file per date, so a rerun only requests the dates that are still missing.
+# Set DATAGOV_API_BASE (e.g. http://localhost:8000) to point the scripts at a local stub server.
+
+API_BASE = os.environ.get("DATAGOV_API_BASE", "https://api-open.data.gov.sg").rstrip("/")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "datasets", "api_cache")
+
+# statuses worth retrying; other 4xx responses mean the request itself is wrong
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, with bursts of up to `capacity`.
+    Shared by all worker threads.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def endpoint(path):
+    # e.g. endpoint("/v2/real-time/api/rainfall")
+    return API_BASE + path
+
+def date_range(start_date, end_date):
+    # "YYYY-MM-DD" strings from start_date to end_date inclusive
+    days = (end_date - start_date).days
+    return [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days + 1)]
+
+def cache_path(dataset, date_str):
+    return os.path.join(CACHE_DIR, dataset, f"{date_str}.json")
+
+def read_cache(dataset, date_str):
+    path = cache_path(dataset, date_str)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def write_cache(dataset, date_str, data):
+    path = cache_path(dataset, date_str)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def fetch_date(session, url, date_str, bucket, retries=4, backoff=1.0, timeout=30):
+    """
+    GET url?date=date_str, retrying timeouts, connection errors, 429 and 5xx responses
+    with exponential backoff (honouring Retry-After). Returns the JSON body or None.
+    """
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            response = session.get(url, params={"date": date_str}, timeout=timeout)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response.json()
+            retry_after = response.headers.get("Retry-After")
+            error = f"HTTP {response.status_code}"
+        except requests.HTTPError as e:
+            print(f"Error fetching data for {date_str}: {e}")
+            return None
+        except (requests.RequestException, ValueError) as e:
+            retry_after = None
+            error = str(e)
+
+        if attempt == retries:
+            print(f"Error fetching data for {date_str} after {retries + 1} attempts: {error}")
+            return None
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * 2 ** attempt
+        time.sleep(delay + random.uniform(0, backoff))
+
+def fetch_dates(url, dates, dataset, workers=8, rate=5.0, retries=4, backoff=1.0):
+    """
+    Fetch every date in `dates` ("YYYY-MM-DD") from url, serving cached dates from
+    CACHE_DIR/<dataset>/. Returns {date_str: JSON body or None if it failed}.
+    Today's and future responses are not cached, since they may still change.
+    """
+    results = {}
+    missing = []
+    for date_str in dates:
+        cached = read_cache(dataset, date_str)
+        if cached is None:
+            missing.append(date_str)
+        else:
+            results[date_str] = cached
+    print(f"[{dataset}] {len(results)} dates cached, fetching {len(missing)}")
+    if not missing:
+        return results
+
+    today = datetime.today().strftime("%Y-%m-%d")
+    bucket = TokenBucket(rate)
+    start = time.perf_counter()
+    with requests.Session() as session:
+        session.mount("https://", HTTPAdapter(pool_maxsize=workers))
+        session.mount("http://", HTTPAdapter(pool_maxsize=workers))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fetch_date, session, url, d, bucket, retries, backoff): d for d in missing}
+            for future in as_completed(futures):
+                date_str = futures[future]
+                data = future.result()
+                results[date_str] = data
+                if data is not None and date_str < today:
+                    write_cache(dataset, date_str, data)
+
+    failed = sum(results[d] is None for d in missing)
+    print(f"[{dataset}] fetched {len(missing) - failed} dates in {time.perf_counter() - start:.1f}s, {failed} failed")
+    return results
@@ -1,18 +1,8 @@
-import requests
 import pandas as pd
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
+from datagov_fetcher import endpoint, date_range, fetch_dates
 
-def fetch_forecast(date_str):
-    url = "https://api-open.data.gov.sg/v2/real-time/api/four-day-outlook"
-    params = {"date": date_str}
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()  # raise an error for bad status codes
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching data for {date_str}: {e}")
-        return None
+url = endpoint("/v2/real-time/api/four-day-outlook")
 
 def main():
     # Data Gov provides data from March 2016 to Feb 2025
@@ -21,12 +11,10 @@ def main():
     
     latest_records = {}
 
-    current_date = start_date
-    while current_date <= end_date:
-        query_date_str = current_date.strftime("%Y-%m-%d")
-        print(f"Fetching data for {query_date_str}...")
-        data = fetch_forecast(query_date_str)
-        
+    # concurrent, rate-limited and cached per date (see datagov_fetcher.py)
+    responses = fetch_dates(url, date_range(start_date, end_date), "four_day_outlook")
+
+    for query_date_str, data in sorted(responses.items()):
         if data:
             records = data.get("data", {}).get("records", [])
             for record in records:
@@ -46,9 +34,6 @@ def main():
         else:
             print(f"Data not available for {query_date_str}.")
 
-        time.sleep(0.3)
-        current_date += timedelta(days=1)
-
     rows = []
     for rec_date, (record, rec_ts) in latest_records.items():
         updatedTimestamp = record.get("updatedTimestamp", "")
@@ -1,8 +1,11 @@
 import os
+import time
+import numpy as np
 import pandas as pd
-import random
 
 data_dir = os.path.join("..", "datasets", "final_data")
+# seed for the synthetic forecasts that fill days without a forecast
+SYNTHETIC_SEED = 42
 
 def filter_dates(df, date_col, start, end):
     return df[(df[date_col] >= start) & (df[date_col] <= end)]
@@ -79,30 +82,35 @@ forecast_cols = [col for col in merged_df.columns if any(key in col.lower() for
     "forecast_summary", "forecast_text", "wind_speed_low_x", "wind_speed_high_x", "wind_direction_x"
 ])]
 
-def is_forecast_empty(row):
-    return all((row[col] == 0 or row[col] == "0" or row[col] == "") for col in forecast_cols)
+def forecast_empty_mask(df, cols):
+    # True where every forecast column is 0, "0" or "" (rows with no forecast)
+    empty = pd.Series(True, index=df.index)
+    for col in cols:
+        empty &= (df[col] == 0) | df[col].astype(str).isin(["0", ""])
+    return empty.to_numpy()
 
-def generate_synthetic_forecast():
+def generate_synthetic_forecasts(n, rng):
+    # n synthetic forecasts at once, one array per column
     return {
-        "temp_low": round(random.uniform(24, 27), 1),
-        "temp_high": round(random.uniform(31, 34), 1),
-        "humidity_low_x": random.randint(55, 70),
-        "humidity_high_x": random.randint(85, 95),
-        "forecast_summary": "Partly Cloudy",
-        "forecast_text_x": "Windy with passing showers",
-        "wind_speed_low_x": random.randint(5, 15),
-        "wind_speed_high_x": random.randint(15, 30),
-        "wind_direction_x": random.choice(["N", "NNE", "NE", "E", "SE", "S", "SW", "W", "NW"])
+        "temp_low": np.round(rng.uniform(24, 27, n), 1),
+        "temp_high": np.round(rng.uniform(31, 34, n), 1),
+        "humidity_low_x": rng.integers(55, 70, n, endpoint=True),
+        "humidity_high_x": rng.integers(85, 95, n, endpoint=True),
+        "forecast_summary": np.full(n, "Partly Cloudy"),
+        "forecast_text_x": np.full(n, "Windy with passing showers"),
+        "wind_speed_low_x": rng.integers(5, 15, n, endpoint=True),
+        "wind_speed_high_x": rng.integers(15, 30, n, endpoint=True),
+        "wind_direction_x": rng.choice(["N", "NNE", "NE", "E", "SE", "S", "SW", "W", "NW"], n)
     }
 
-synthetic_count = 0
-for idx, row in merged_df.iterrows():
-    if is_forecast_empty(row):
-        synthetic = generate_synthetic_forecast()
-        for col, val in synthetic.items():
-            if col in merged_df.columns:
-                merged_df.at[idx, col] = val
-        synthetic_count += 1
+start_time = time.perf_counter()
+empty_rows = forecast_empty_mask(merged_df, forecast_cols)
+synthetic_count = int(empty_rows.sum())
+synthetic = generate_synthetic_forecasts(synthetic_count, np.random.default_rng(SYNTHETIC_SEED))
+for col, values in synthetic.items():
+    if col in merged_df.columns:
+        merged_df.loc[empty_rows, col] = values
+print(f"[i] Filled {synthetic_count} synthetic forecast rows in {time.perf_counter() - start_time:.3f}s")
 
 # Save output
 output_file = os.path.join(data_dir, "merged_weather_data_clean.csv")
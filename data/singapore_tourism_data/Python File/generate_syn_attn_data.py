@@ -4,6 +4,8 @@ from sklearn.ensemble import RandomForestRegressor
 from faker import Faker
 from faker.providers import BaseProvider
 import re
+import argparse
+import time
 from datetime import datetime
 
 class USSAttendanceProvider(BaseProvider):
@@ -13,6 +15,8 @@ class USSAttendanceProvider(BaseProvider):
         self.model_features = model_features
         self.residual_std = residual_std
         self.year_attendance_dict = year_attendance_dict
+        self.circuit_breaker_start = pd.to_datetime("2020-04-07")
+        self.circuit_breaker_end = pd.to_datetime("2020-06-30")
 
     def generate_attendance(self, row):
         year = row["Year"]
@@ -44,7 +48,61 @@ class USSAttendanceProvider(BaseProvider):
 
         attendance = base * boost + noise
         return int(max(0, round(attendance)))
-def main():
+
+    def generate_ensemble(self, df, n_scenarios, rng=None):
+        """
+        n_scenarios independent synthetic attendance series for the days in df, in one
+        vectorised pass: a single model.predict call and (n_scenarios x days) arrays of
+        boost and noise draws from rng (a numpy.random.Generator). Circuit breaker days
+        use a wait time / tourism proxy instead of the model. Returns a float32
+        (n_scenarios, days) array, before scaling to the yearly totals.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        size = (n_scenarios, len(df))
+        flag = lambda col: df[col].fillna(0).to_numpy(dtype=float) if col in df else np.zeros(len(df))
+
+        base = self.model.predict(df.reindex(columns=self.model_features, fill_value=0).fillna(0))
+
+        # Contextual boost logic, one draw per scenario and day
+        boost = 1.0 + rng.uniform(0.05, 0.15, size) * (flag("IsSchoolHolidayFlag") != 0)
+        boost += rng.uniform(0.1, 0.25, size) * (flag("IsPublicHolidayFlag") != 0)
+        boost += rng.uniform(0.2, 0.35, size) * (flag("SpecialEventFlag") != 0)
+        boost += rng.uniform(0.1, 0.2, size) * df["DayOfWeek"].isin([5, 6]).to_numpy()
+        # Rain effect
+        boost -= rng.uniform(0.05, 0.2, size) * (flag("RainfallVal") > 5)
+
+        # Add scaled noise
+        noise = rng.normal(0, self.residual_std * rng.uniform(0.9, 1.5, size))
+        attendance = np.maximum(0, np.rint(base * boost + noise))
+
+        closed_years = [y for y, total in self.year_attendance_dict.items() if total == 0]
+        attendance[:, df["Year"].isin(closed_years).to_numpy()] = 0
+
+        circuit = df["Date"].between(self.circuit_breaker_start, self.circuit_breaker_end).to_numpy()
+        proxy = (flag("Actual") * 0.7 + flag("TourismValue") * 0.3)[circuit]
+        attendance[:, circuit] = np.rint(proxy * rng.uniform(0.5, 1.2, (n_scenarios, circuit.sum())))
+        return attendance.astype(np.float32)
+
+def year_targets(df, year_attendance_dict):
+    # yearly attendance totals; the current year is pro-rated to the days elapsed so far
+    today = pd.Timestamp(datetime.today().date())
+    targets = pd.Series(year_attendance_dict, dtype=float)
+    if 2025 in targets.index:
+        days_2025 = df["Date"].dt.year == 2025
+        year_days = 366 if pd.Timestamp("2025-12-31").is_leap_year else 365
+        targets[2025] *= df.loc[days_2025, "Date"].le(today).sum() / year_days
+    return targets
+
+def scale_to_year_targets(attendance, years, targets):
+    # rescale every (scenario x day) row so each year sums to its target total
+    year_ids, year_idx = np.unique(years, return_inverse=True)
+    totals = np.zeros((attendance.shape[0], len(year_ids)))
+    np.add.at(totals.T, year_idx, attendance.T)
+    target_totals = np.broadcast_to(targets.reindex(year_ids).to_numpy(), totals.shape)
+    scale = np.divide(target_totals, totals, out=np.zeros_like(totals), where=totals > 0)
+    return np.rint(attendance * scale[:, year_idx]).astype(np.float32)
+def main(n_scenarios=0, seed=42):
+    start = time.perf_counter()
     year_attendance_dict = {
         2017: 4220000, 2018: 4400000, 2019: 4500000,
         2020: 1098000, 2021: 1200000, 2022: 2100000,
@@ -94,7 +152,8 @@ def main():
     for (year, month), total_visitors in tourism_dict.items():
         days_in_month = pd.Period(f"{year}-{month:02d}").days_in_month
         tourism_weighted[(year, month)] = total_visitors / days_in_month
-    df["TourismValue"] = df.apply(lambda r: tourism_weighted.get((r["Year"], r["Month"]), 0), axis=1)
+    year_month = pd.MultiIndex.from_arrays([df["Year"], df["Month"]])
+    df["TourismValue"] = pd.Series(tourism_weighted, dtype=float).reindex(year_month, fill_value=0).to_numpy()
 
     df["IsPublicHolidayFlag"] = df["IsPublicHoliday"].fillna(False).astype(bool).astype(int) if "IsPublicHoliday" in df else 0
     df["IsSchoolHolidayFlag"] = df["IsSchoolHoliday"].fillna(False).astype(bool).astype(int) if "IsSchoolHoliday" in df else 0
@@ -135,28 +194,27 @@ def main():
     provider = USSAttendanceProvider(fake, model, model_features, residual_std, year_attendance_dict)
     fake.add_provider(provider)
 
-    cb_start = pd.to_datetime("2020-04-07")
-    cb_end = pd.to_datetime("2020-06-30")
-    df["USSAttendance"] = df.apply(
-        lambda r: int(round((r["Actual"] * 0.7 + r["TourismValue"] * 0.3) * np.random.uniform(0.5, 1.2)))
-        if cb_start <= r["Date"] <= cb_end else provider.generate_attendance(r),
-        axis=1
-    )
+    rng = np.random.default_rng(seed)
+    attendance = provider.generate_ensemble(df, 1, rng)
 
     # Final normalization to yearly target
-    df["TotalByYear"] = df.groupby("Year")["USSAttendance"].transform("sum")
-    today = pd.Timestamp(datetime.today().date())
-    df["DaysElapsed"] = df["Date"].le(today).astype(int)
-    df["YearTotalDays"] = df["Date"].dt.year.map(lambda y: 366 if pd.Timestamp(f"{y}-12-31").is_leap_year else 365)
-    df["TargetTotal"] = df.apply(
-        lambda r: (year_attendance_dict[r["Year"]] * df[df["Year"] == r["Year"]]["DaysElapsed"].sum() / r["YearTotalDays"])
-        if r["Year"] == 2025 else year_attendance_dict[r["Year"]],
-        axis=1
-    )
-    df["ScalingFactor"] = df["TargetTotal"] / df["TotalByYear"]
-    df["USSAttendance"] = (df["USSAttendance"] * df["ScalingFactor"]).round().astype(int)
+    targets = year_targets(df, year_attendance_dict)
+    df["USSAttendance"] = scale_to_year_targets(attendance, df["Year"].to_numpy(), targets)[0].astype(int)
 
     df[["Date", "USSAttendance"]].to_csv("../Final/synthetic_data_daily_attendance/synthetic_daily_attendance_2017_2025.csv", index=False)
 
+    if n_scenarios > 0:
+        # Ensemble of independent synthetic years for stress-testing staffing plans
+        ensemble = provider.generate_ensemble(df, n_scenarios, rng)
+        ensemble = scale_to_year_targets(ensemble, df["Year"].to_numpy(), targets)
+        ensemble_path = "../Final/synthetic_data_daily_attendance/synthetic_attendance_scenarios_2017_2025.npz"
+        np.savez_compressed(ensemble_path, attendance=ensemble, dates=df["Date"].to_numpy().astype("datetime64[D]"))
+        print(f"Saved {n_scenarios} scenarios x {ensemble.shape[1]} days to {ensemble_path}")
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate synthetic daily USS attendance")
+    parser.add_argument("--scenarios", type=int, default=0, help="also generate this many independent scenarios (float32 .npz)")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the daily series and the scenario ensemble")
+    args = parser.parse_args()
+    main(args.scenarios, args.seed)
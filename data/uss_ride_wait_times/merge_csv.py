@@ -1,65 +1,180 @@
-import csv
+import argparse
 import glob
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
 
-def merge_csv(folder, output):
-    file_pattern = 'Raw Data/' + folder + '/download*.csv'
-    first_file = True
-
-    with open(output, 'w', newline='') as outfile:
-        writer = csv.writer(outfile)
-        for filename in glob.glob(file_pattern):
-            with open(filename, 'r') as infile:
-                reader = csv.reader(infile)
-                try:
-                    headers = next(reader)
-                    if first_file:
-                        writer.writerow(headers)
-                        first_file = False
-                    for row in reader:
-                        writer.writerow(row)
-                except StopIteration:
-                    continue  # skip empty files
-    return
-
-merge_csv('Accelerator', 'merged_accelerator.csv')
-merge_csv('Battlestar Galactica_CYLON', 'merged_cylon.csv')
-merge_csv('Battlestar Galactica_HUMAN', 'merged_human.csv')
-merge_csv('Buggie Boogie', 'merged_buggieboogie.csv')
-merge_csv('Canopy Flyer', 'merged_canopyflyer.csv')
-merge_csv('Despicable Me Minion Mayhem', 'merged_minionmayhem.csv')
-merge_csv('Dino Soarin', 'merged_dinosoarin.csv')
-merge_csv('Enchanted Airways', 'merged_enchantedairways.csv')
-merge_csv('Jurassic Park Rapids Adventure', 'merged_jurassic.csv')
-merge_csv('Lights Camera Action_Hosted by Steven Spielberg', 'merged_lightscameraaction.csv')
-merge_csv('Magic Potion Spin', 'merged_magicpotionspin.csv')
-merge_csv('Puss in Boots Giant Journey', 'merged_pussinboots.csv')
-merge_csv('Revenge of the Mummy', 'merged_mummy.csv')
-merge_csv('Sesame Street Spaghetti Space Chase', 'merged_sesamestreet.csv')
-merge_csv('Shrek 4D Adventure', 'merged_shrek.csv')
-merge_csv('Silly Swirly', 'merged_sillyswirly.csv')
-merge_csv('TRANSFORMERS The Ride', 'merged_transformers.csv')
-merge_csv('Treasure Hunters', 'merged_treasurehunters.csv')
-
-def merge_csv_full(output):
-    file_pattern = 'merged*.csv'
-    first_file = True
-
-    with open(output, 'w', newline='') as outfile:
-        writer = csv.writer(outfile)
-        for filename in glob.glob(file_pattern):
-            with open(filename, 'r') as infile:
-                reader = csv.reader(infile)
-                try:
-                    headers = next(reader)
-                    if first_file:
-                        writer.writerow(headers)
-                        first_file = False
-                    for row in reader:
-                        writer.writerow(row)
-                except StopIteration:
-                    continue  # skip empty files
-    return
-
-merge_csv_full('all_ride_wait_times.csv')
-
-# when using with rides.csv, include: ride_wait_times['Ride'] = ride_wait_times['Ride'].str.replace('Puss In Boots’ Giant Journey', 'Puss In Boots\' Giant Journey')
\ No newline at end of file
+# Ingests the monthly Thrill Data downloads in Raw Data/<ride>/download*.csv.
+# Each ride is processed in its own worker: shards are streamed in chunks, repeated header
+# rows and duplicate timestamps are dropped, and types are parsed once. The result is a
+# partitioned Parquet dataset, ride_wait_times/ride=<name>/year=<yyyy>/part-0.parquet,
+# with columns Ride, datetime and wait_time. merged_<name>.csv and all_ride_wait_times.csv
+# are still written from it for the existing CSV readers.
+# With --incremental, only download files that are new or changed since the last run are read.
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(base_dir, "Raw Data")
+DATASET_DIR = os.path.join(base_dir, "ride_wait_times")
+MANIFEST_PATH = os.path.join(DATASET_DIR, "_manifest.json")
+CHUNK_ROWS = 50_000
+
+# Raw Data folder -> short ride name used in file names and by the ride models
+RIDES = {
+    'Accelerator': 'accelerator',
+    'Battlestar Galactica_CYLON': 'cylon',
+    'Battlestar Galactica_HUMAN': 'human',
+    'Buggie Boogie': 'buggieboogie',
+    'Canopy Flyer': 'canopyflyer',
+    'Despicable Me Minion Mayhem': 'minionmayhem',
+    'Dino Soarin': 'dinosoarin',
+    'Enchanted Airways': 'enchantedairways',
+    'Jurassic Park Rapids Adventure': 'jurassic',
+    'Lights Camera Action_Hosted by Steven Spielberg': 'lightscameraaction',
+    'Magic Potion Spin': 'magicpotionspin',
+    'Puss in Boots Giant Journey': 'pussinboots',
+    'Revenge of the Mummy': 'mummy',
+    'Sesame Street Spaghetti Space Chase': 'sesamestreet',
+    'Shrek 4D Adventure': 'shrek',
+    'Silly Swirly': 'sillyswirly',
+    'TRANSFORMERS The Ride': 'transformers',
+    'Treasure Hunters': 'treasurehunters',
+}
+
+COLUMNS = ["Ride", "datetime", "wait_time"]
+
+def empty_frame():
+    # typed like a parsed shard, so .dt accessors work on it
+    return pd.DataFrame({
+        "Ride": pd.Series(dtype=str),
+        "datetime": pd.Series(dtype="datetime64[ns]"),
+        "wait_time": pd.Series(dtype=float),
+    })
+
+def shard_paths(folder):
+    return sorted(glob.glob(os.path.join(RAW_DIR, folder, "download*.csv")))
+
+def shard_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    os.makedirs(DATASET_DIR, exist_ok=True)
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+def read_shard(path):
+    # stream one download file, dropping repeated header rows and parsing types once
+    chunks = []
+    try:
+        for chunk in pd.read_csv(path, dtype=str, chunksize=CHUNK_ROWS):
+            chunk = chunk[chunk["Date/Time"] != "Date/Time"]
+            chunks.append(pd.DataFrame({
+                "Ride": chunk["Ride"],
+                "datetime": pd.to_datetime(chunk["Date/Time"], errors="coerce"),
+                "wait_time": pd.to_numeric(chunk["Wait Time"], errors="coerce"),
+            }))
+    except pd.errors.EmptyDataError:
+        pass  # skip empty files
+    if not chunks:
+        return empty_frame()
+    return pd.concat(chunks, ignore_index=True).dropna(subset=["datetime", "wait_time"])
+
+def partition_path(name, year):
+    return os.path.join(DATASET_DIR, f"ride={name}", f"year={year}", "part-0.parquet")
+
+def read_partitions(name, years=None):
+    paths = sorted(glob.glob(os.path.join(DATASET_DIR, f"ride={name}", "year=*", "*.parquet")))
+    if years is not None:
+        wanted = {f"year={y}" for y in years}
+        paths = [p for p in paths if os.path.basename(os.path.dirname(p)) in wanted]
+    if not paths:
+        return empty_frame()
+    return pd.concat([pd.read_parquet(p) for p in paths], ignore_index=True)
+
+def to_legacy_csv(df):
+    # original Thrill Data layout (Ride, Date/Time, Wait Time), one header row
+    return df.rename(columns={"datetime": "Date/Time", "wait_time": "Wait Time"})[["Ride", "Date/Time", "Wait Time"]]
+
+def ingest_ride(name, shards, incremental):
+    """
+    Merge the given shards into the ride's partitions and rewrite merged_<name>.csv.
+    In incremental mode the partitions for the years the shards touch are merged with
+    the new rows; otherwise the ride's partitions are rebuilt from scratch.
+    Returns (name, rows in the ride's dataset).
+    """
+    new_rows = pd.concat([read_shard(p) for p in shards], ignore_index=True)
+    if new_rows.empty:
+        # empty or header-only downloads: leave the ride's dataset as it is
+        return name, len(read_partitions(name))
+
+    ride_dir = os.path.join(DATASET_DIR, f"ride={name}")
+    if not incremental and os.path.isdir(ride_dir):
+        shutil.rmtree(ride_dir)
+    years = sorted(new_rows["datetime"].dt.year.unique())
+    existing = read_partitions(name, years) if incremental else empty_frame()
+
+    df = pd.concat([existing, new_rows], ignore_index=True)
+    df = df.drop_duplicates(subset="datetime", keep="last").sort_values("datetime")
+    if len(df) and (df["wait_time"] % 1 == 0).all():
+        df["wait_time"] = df["wait_time"].astype("int64")
+    for year, part in df.groupby(df["datetime"].dt.year):
+        path = partition_path(name, year)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part[COLUMNS].to_parquet(path, index=False)
+
+    ride_df = read_partitions(name).sort_values("datetime")
+    to_legacy_csv(ride_df).to_csv(os.path.join(base_dir, f"merged_{name}.csv"), index=False)
+    return name, len(ride_df)
+
+def merge_all(incremental=False, workers=None):
+    manifest = load_manifest() if incremental else {}
+    jobs = {}
+    for folder, name in RIDES.items():
+        shards = shard_paths(folder)
+        if incremental:
+            shards = [p for p in shards if manifest.get(os.path.relpath(p, base_dir)) != shard_signature(p)]
+        if shards:
+            jobs[name] = shards
+    if not jobs:
+        print("No new download files.")
+        return
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    print(f"Ingesting {sum(len(s) for s in jobs.values())} files for {len(jobs)} rides on {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(ingest_ride, name, shards, incremental): name for name, shards in jobs.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                _, rows = future.result()
+                for path in jobs[name]:
+                    manifest[os.path.relpath(path, base_dir)] = shard_signature(path)
+                print(f"{name}: {rows} readings")
+            except Exception as e:
+                print(f"Failed to ingest {name}: {e}")
+    save_manifest(manifest)
+
+    # all rides in one CSV, for readers of all_ride_wait_times.csv
+    all_rides = pd.concat([read_partitions(name) for name in RIDES.values()], ignore_index=True)
+    to_legacy_csv(all_rides).to_csv(os.path.join(base_dir, "all_ride_wait_times.csv"), index=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the Thrill Data downloads into a ride/year partitioned dataset")
+    parser.add_argument("--incremental", action="store_true", help="only read download files that are new or changed")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    merge_all(args.incremental, args.workers)
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+# when using with rides.csv, include: ride_wait_times['Ride'] = ride_wait_times['Ride'].str.replace('Puss In Boots’ Giant Journey', 'Puss In Boots\' Giant Journey')
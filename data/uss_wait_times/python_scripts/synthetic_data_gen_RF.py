@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 import re
+import time
 from sklearn.ensemble import RandomForestRegressor
 from faker import Faker
 from faker.providers import BaseProvider
@@ -49,7 +50,48 @@ class USSWaitTimeProvider(BaseProvider):
         comment = "Predicted" if delta == 0 else ("Over-Predicted" if delta > 0 else "Under-Predicted")
         return (pred_rounded, delta, comment)
 
-def main():
+    def generate_batch(self, df, rng=None):
+        """
+        Vectorised generate_actual + generate_prediction for every row of df: one
+        model_reg.predict call, noise and delta samples drawn as arrays from rng
+        (a numpy.random.Generator, e.g. np.random.default_rng(42), for reproducible runs).
+        Returns a frame with Actual, Prediction, Delta and Comment aligned to df.index.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        dates = pd.to_datetime(df["Date"])
+        circuit = dates.between(self.circuit_breaker_start, self.circuit_breaker_end).to_numpy()
+        partial = dates.between(self.partial_start, self.partial_end).to_numpy()
+        n = len(df)
+
+        # no prediction is needed for circuit breaker days, they are closed
+        base_pred = np.zeros(n)
+        open_days = ~circuit
+        if open_days.any():
+            X_features = df.loc[open_days].reindex(columns=self.model_features, fill_value=0).fillna(0)
+            base_pred[open_days] = self.model_reg.predict(X_features)
+        raw_val = base_pred + rng.normal(0, self.residual_std, n)
+        raw_val[partial] *= 0.3
+        actual = np.rint(np.maximum(raw_val, 0)).astype(int)
+        actual[circuit] = 0
+
+        if len(self.real_deltas) == 0:
+            prediction = actual.copy()
+        else:
+            delta_samp = rng.choice(self.real_deltas, n)
+            prediction = np.rint(np.maximum(actual + delta_samp, 0)).astype(int)
+        prediction[circuit] = 0
+        delta = prediction - actual
+        comment = np.select([delta > 0, delta < 0], ["Over-Predicted", "Under-Predicted"], default="Predicted")
+
+        return pd.DataFrame({
+            "Actual": actual,
+            "Prediction": prediction,
+            "Delta": delta,
+            "Comment": comment
+        }, index=df.index)
+
+def main(seed=42):
+    start = time.perf_counter()
     df_wait = pd.read_csv("../cleaned_data_2022_2025/2022_to_2025_wait_times_cleaned.csv")
     df_wait["Date"] = pd.to_datetime(df_wait["Date"])
     df_wait["DayOfWeek"] = df_wait["Date"].dt.dayofweek
@@ -100,10 +142,9 @@ def main():
     df_merged["Month"] = df_merged["Date"].dt.month
     df_merged["DayOfWeek"] = df_merged["Date"].dt.dayofweek
 
-    def tourism_for_row(row):
-        return tourism_dict.get((row["Year"], row["Month"]), 0)
-
-    df_merged["TourismValue"] = df_merged.apply(tourism_for_row, axis=1)
+    # monthly tourism totals looked up for all rows at once by (Year, Month)
+    year_month = pd.MultiIndex.from_arrays([df_merged["Year"], df_merged["Month"]])
+    df_merged["TourismValue"] = pd.Series(tourism_dict, dtype=float).reindex(year_month, fill_value=0).to_numpy()
     df_merged["IsPublicHolidayFlag"] = df_merged["IsPublicHoliday"].fillna(False).astype(bool).astype(int) if "IsPublicHoliday" in df_merged else 0
     df_merged["IsSchoolHolidayFlag"] = df_merged["IsSchoolHoliday"].fillna(False).astype(bool).astype(int) if "IsSchoolHoliday" in df_merged else 0
     df_merged["SpecialEventFlag"] = df_merged["SomeEventFlag"].fillna(False).astype(bool).astype(int) if "SomeEventFlag" in df_merged else 0
@@ -129,12 +170,7 @@ def main():
     fake.add_provider(provider)
 
     df_syn = df_merged[df_merged["Actual"].isna()].copy()
-    def generate_synthetic_row(r):
-        actual = provider.generate_actual(r)
-        prediction, delta, comment = provider.generate_prediction(actual, r["Date"])
-        return pd.Series([actual, prediction, delta, comment], index=["Actual", "Prediction", "Delta", "Comment"])
-
-    syn_results = df_syn.apply(generate_synthetic_row, axis=1)
+    syn_results = provider.generate_batch(df_syn, np.random.default_rng(seed))
 
     # Drop any of the result columns if they already exist in df_syn
     df_syn = df_syn.drop(columns=[col for col in ["Actual", "Prediction", "Delta", "Comment"] if col in df_syn.columns])
@@ -146,6 +182,7 @@ def main():
     df_final = df_final[["Date", "Prediction", "Actual", "Delta", "Comment"]]
 
     df_final.to_csv("../augmented_wait_time_data/2017_to_2025_synthetic_wait_times_final.csv", index=False)
+    print(f"Generated {len(df_syn)} synthetic days in {time.perf_counter() - start:.1f}s")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
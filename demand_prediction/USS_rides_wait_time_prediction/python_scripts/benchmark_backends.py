@@ -0,0 +1,55 @@
+import argparse
+import os
+import time
+from math import sqrt
+import pandas as pd
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from feature_store import load_ride_features
+from model_registry import MODELS_DIR
+from ride_estimators import BACKENDS, build_preprocessor, fit_ride_estimator
+
+# Benchmarks the estimator backends on the same rides, train/test split and CPU budget,
+# reporting search + fit time, test RMSE / R² and speedup over the original "gb" backend.
+
+def benchmark_ride(ride_name, backends=BACKENDS, n_jobs=-1):
+    df = load_ride_features(ride_name, exclude=["date"])
+    X = df.drop(columns=["datetime", "wait_time"], errors="ignore")
+    y = df["wait_time"]
+    preprocessor, _, _ = build_preprocessor(X)
+    X_processed = preprocessor.fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_processed, y, test_size=0.2, shuffle=False)
+
+    rows = []
+    for backend in backends:
+        start = time.perf_counter()
+        search = fit_ride_estimator(X_train, y_train, backend=backend, n_jobs=n_jobs)
+        fit_seconds = time.perf_counter() - start
+        y_pred = search.best_estimator_.predict(X_test)
+        rows.append({
+            "ride": ride_name,
+            "backend": backend,
+            "rows": len(y),
+            "Fit Seconds": fit_seconds,
+            "Test RMSE": sqrt(mean_squared_error(y_test, y_pred)),
+            "Test R2": r2_score(y_test, y_pred),
+        })
+        print(f"{ride_name:>18} {backend:>4}: {fit_seconds:8.1f}s  RMSE={rows[-1]['Test RMSE']:.3f}")
+
+    results = pd.DataFrame(rows)
+    if "gb" in backends:
+        gb_seconds = results.loc[results["backend"] == "gb", "Fit Seconds"].iloc[0]
+        results["Speedup vs gb"] = gb_seconds / results["Fit Seconds"]
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ride model backends on training time and RMSE")
+    parser.add_argument("--rides", nargs="+", default=["minionmayhem"], help="ride file names to benchmark")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    results = pd.concat([benchmark_ride(r, args.backends, args.n_jobs) for r in args.rides], ignore_index=True)
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    results.to_csv(os.path.join(MODELS_DIR, "backend_benchmark.csv"), index=False)
+    print(results.to_string(index=False))
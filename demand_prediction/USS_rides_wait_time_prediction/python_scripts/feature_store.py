@@ -0,0 +1,287 @@
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Feature store for the ride wait time models.
+# The 5-minute ride readings joined with weather, rainfall, school holidays and events are
+# materialised once per ride into features/<ride>_features.parquet (typed datetime columns),
+# together with a fingerprint of the source files. Training and the app read the Parquet file
+# back, selecting only the columns they need, and it is rebuilt only when a source file changes.
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(current_dir, "..", "..", "..", "data")
+FEATURES_DIR = os.path.join(current_dir, "..", "features")
+
+# Bump whenever build_ride_features changes so materialised tables are rebuilt
+FEATURE_VERSION = 4
+
+# Features derived from a ride's own past wait times
+LAG_FEATURES = ["wait_time_lag1", "wait_time_lag2", "wait_time_rolling3", "wait_time_rolling6"]
+
+# A 5-minute rainfall reading is carried forward to later ride readings for at most this long
+RAIN_TOLERANCE = pd.Timedelta(minutes=15)
+
+weather_data_path  = os.path.join(DATA_DIR, "Meteorological", "datasets", "final_data", "24_hr_weather_forecast_data.csv")
+rainfall_data_path = os.path.join(DATA_DIR, "Meteorological", "datasets", "final_data", "sentosa_rainfall_5min_int.csv")
+school_hols_path   = os.path.join(DATA_DIR, "Events", "Holidays", "datasets", "daily_school_holidays_combined_updated.csv")
+event_data_path    = os.path.join(DATA_DIR, "Events", "EventData", "supplementary_event_data_2016_2025.csv")
+
+# (path, size, mtime) -> sha256, so unchanged files are not re-hashed within a session
+_hash_cache = {}
+# parsed side tables (weather, rain, school holidays, events), shared by every ride in this process
+_side_tables = None
+
+def ride_data_path(ride_name):
+    return os.path.join(DATA_DIR, "uss_ride_wait_times", f"merged_{ride_name}.csv")
+
+def ride_partition_paths(ride_name):
+    # Parquet partitions of the ride in the ride/year dataset written by merge_csv.py
+    ride_dir = os.path.join(DATA_DIR, "uss_ride_wait_times", "ride_wait_times", f"ride={ride_name}")
+    return sorted(glob.glob(os.path.join(ride_dir, "year=*", "*.parquet")))
+
+def ride_readings_paths(ride_name):
+    # Where load_ride_readings reads the ride from: its partitions, else the merged CSV
+    return ride_partition_paths(ride_name) or [ride_data_path(ride_name)]
+
+def has_ride_readings(ride_name):
+    return all(os.path.exists(p) for p in ride_readings_paths(ride_name))
+
+def ride_source_paths(ride_name):
+    # All input files a ride's feature table is built from
+    return [
+        *ride_readings_paths(ride_name),
+        weather_data_path,
+        rainfall_data_path,
+        school_hols_path,
+        event_data_path,
+    ]
+
+def shared_source_paths(ride_names):
+    # All input files of a model trained on several rides' pooled feature tables
+    return list(dict.fromkeys(p for ride in sorted(ride_names) for p in ride_source_paths(ride)))
+
+def file_hash(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _hash_cache:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        _hash_cache[key] = sha.hexdigest()
+    return _hash_cache[key]
+
+def data_fingerprint(paths):
+    # Combined hash of the source files; missing files hash as "missing"
+    sha = hashlib.sha256(f"v{FEATURE_VERSION}".encode())
+    for path in paths:
+        digest = file_hash(path) if os.path.exists(path) else "missing"
+        sha.update(f"{os.path.basename(path)}:{digest}".encode())
+    return sha.hexdigest()
+
+def _strip_tz(series):
+    if getattr(series.dt, "tz", None) is not None:
+        return series.dt.tz_localize(None)
+    return series
+
+def load_side_tables():
+    """
+    Parse the weather, rainfall, school holiday and event tables once per process.
+    """
+    global _side_tables
+    if _side_tables is not None:
+        return _side_tables
+
+    # Weather forecasts, each valid over [valid_start, valid_end)
+    df_weather = pd.read_csv(weather_data_path)
+    df_weather["valid_start"] = pd.to_datetime(df_weather["valid_start"], errors="coerce")
+    df_weather.dropna(subset=["valid_start"], inplace=True)
+    df_weather["valid_start"] = _strip_tz(df_weather["valid_start"])
+    if "valid_end" in df_weather.columns:
+        df_weather["valid_end"] = _strip_tz(pd.to_datetime(df_weather["valid_end"], errors="coerce"))
+    df_weather = df_weather.sort_values("valid_start").reset_index(drop=True)
+
+    # Rainfall => rename timestamp -> datetime
+    df_rain = pd.read_csv(rainfall_data_path, usecols=["timestamp", "rainfall"])
+    df_rain.rename(columns={"timestamp": "datetime"}, inplace=True)
+    df_rain["datetime"] = pd.to_datetime(df_rain["datetime"], errors="coerce")
+    df_rain.dropna(subset=["datetime"], inplace=True)
+    df_rain["datetime"] = _strip_tz(df_rain["datetime"])
+    df_rain = df_rain.sort_values("datetime").reset_index(drop=True)
+
+    # School holidays, keyed on a normalised datetime rather than python date objects
+    df_school = pd.read_csv(school_hols_path)
+    df_school["date"] = pd.to_datetime(df_school["date"], format="%d/%m/%Y", errors="coerce")
+    if "holiday_flag" not in df_school.columns:
+        df_school["holiday_flag"] = 0
+    df_school = df_school[["date", "holiday_flag"]]
+
+    # Events
+    df_events = pd.read_csv(event_data_path)
+    if "Date" in df_events.columns:
+        df_events.rename(columns={"Date": "date"}, inplace=True)
+    df_events["date"] = pd.to_datetime(df_events["date"], format="%m/%d/%Y", errors="coerce")
+
+    _side_tables = {
+        "weather": df_weather,
+        "rain": df_rain,
+        "school": df_school,
+        "events": df_events,
+    }
+    return _side_tables
+
+def load_ride_readings(ride_name):
+    partitions = ride_partition_paths(ride_name)
+    if partitions:
+        # already typed, de-duplicated and sorted by merge_csv.py
+        df_ride = pd.concat([pd.read_parquet(p, columns=["datetime", "wait_time"]) for p in partitions], ignore_index=True)
+        df_ride["datetime"] = _strip_tz(df_ride["datetime"])
+        return df_ride
+    # fall back to the merged CSV when the partitioned dataset has not been built
+    df_ride = pd.read_csv(ride_data_path(ride_name))
+    df_ride = df_ride[df_ride["Date/Time"] != "Date/Time"]  # remove repeated headers if any
+    df_ride = df_ride.rename(columns={"Date/Time": "datetime", "Wait Time": "wait_time"})
+    df_ride["wait_time"] = pd.to_numeric(df_ride["wait_time"], errors="coerce")
+    df_ride.dropna(subset=["wait_time"], inplace=True)
+    df_ride["datetime"] = pd.to_datetime(df_ride["datetime"], errors="coerce")
+    df_ride.dropna(subset=["datetime"], inplace=True)
+    df_ride["datetime"] = _strip_tz(df_ride["datetime"])
+    # drop the ride column as it is not used in model training
+    return df_ride.drop(columns=["Ride"], errors="ignore")
+
+def interval_join(left, right, start_col="valid_start", end_col="valid_end", on="datetime"):
+    """
+    Attach to each row of `left` the row of `right` whose [start_col, end_col) interval
+    contains left[on]. Both frames must be sorted by their time key; rows that fall outside
+    every interval get NaN for the right-hand columns.
+    """
+    merged = pd.merge_asof(left, right, left_on=on, right_on=start_col, direction="backward")
+    value_cols = [c for c in right.columns if c not in (start_col, end_col)]
+    if end_col in merged.columns:
+        expired = (merged[on] >= merged[end_col]).to_numpy()
+        if expired.any():
+            merged.loc[expired, value_cols] = np.nan
+    return merged.drop(columns=[start_col, end_col], errors="ignore")
+
+def asof_join(left, right, on="datetime", tolerance=None):
+    """
+    Attach to each row of `left` the latest row of `right` at or before left[on],
+    ignoring matches older than `tolerance`. Both frames must be sorted by `on`.
+    """
+    return pd.merge_asof(left, right, on=on, direction="backward", tolerance=tolerance)
+
+def join_side_tables(df, side_tables=None):
+    """
+    Attach weather, rainfall, school holiday and event columns to a frame of 5-minute
+    timestamps (a "datetime" column sorted ascending).
+    """
+    if side_tables is None:
+        side_tables = load_side_tables()
+
+    # time joins over sorted arrays: the forecast valid at each reading, and the latest rainfall
+    df_merged = interval_join(df, side_tables["weather"])
+    df_merged = asof_join(df_merged, side_tables["rain"], tolerance=RAIN_TOLERANCE)
+
+    # merge daily data (holidays/events)
+    df_merged["date"] = df_merged["datetime"].dt.normalize()
+    df_merged = df_merged.merge(side_tables["school"], on="date", how="left")
+    df_merged["holiday_flag"] = df_merged["holiday_flag"].fillna(0)
+    df_merged = df_merged.merge(side_tables["events"], on="date", how="left")
+    return add_calendar_features(df_merged)
+
+def add_calendar_features(df):
+    # time of day (in hours) and weekday, known in advance for any future timestamp
+    df["hour_of_day"] = df["datetime"].dt.hour + df["datetime"].dt.minute / 60
+    df["day_of_week"] = df["datetime"].dt.dayofweek.astype("int64")
+    return df
+
+def add_lag_features(wait_times):
+    """
+    Lag and rolling features from past readings only, so they can be rolled forward
+    step by step when forecasting (see ride_forecaster.py).
+    """
+    past = wait_times.shift(1)
+    return pd.DataFrame({
+        "wait_time_lag1": past,
+        "wait_time_lag2": wait_times.shift(2),
+        "wait_time_rolling3": past.rolling(window=3).mean(),
+        "wait_time_rolling6": past.rolling(window=6).mean(),
+    }, index=wait_times.index)
+
+def finalise_features(df):
+    df = df.fillna(0)
+    # text columns are stored as plain strings so the table round-trips through Parquet
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype(str)
+    return df
+
+def build_ride_features(ride_name, side_tables=None):
+    """
+    Join one ride's 5-minute readings with the side tables and add lag/rolling features.
+    """
+    df_ride = load_ride_readings(ride_name).sort_values("datetime").reset_index(drop=True)
+    df_merged = join_side_tables(df_ride, side_tables)
+
+    # create lag & rolling features due to time series data
+    df_merged = pd.concat([df_merged, add_lag_features(df_merged["wait_time"])], axis=1)
+    return finalise_features(df_merged)
+
+def features_path(ride_name):
+    return os.path.join(FEATURES_DIR, f"{ride_name}_features.parquet")
+
+def _meta_path(ride_name):
+    return os.path.join(FEATURES_DIR, f"{ride_name}_features.json")
+
+def _is_fresh(ride_name, fingerprint):
+    if not (os.path.exists(features_path(ride_name)) and os.path.exists(_meta_path(ride_name))):
+        return False
+    with open(_meta_path(ride_name)) as f:
+        return json.load(f).get("fingerprint") == fingerprint
+
+def materialise_ride_features(ride_name, side_tables=None, force=False):
+    """
+    Write the joined feature table for a ride to Parquet, unless an up-to-date one exists.
+    Returns the path of the Parquet file.
+    """
+    fingerprint = data_fingerprint(ride_source_paths(ride_name))
+    path = features_path(ride_name)
+    if not force and _is_fresh(ride_name, fingerprint):
+        return path
+
+    df = build_ride_features(ride_name, side_tables)
+    os.makedirs(FEATURES_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    with open(_meta_path(ride_name), "w") as f:
+        json.dump({"fingerprint": fingerprint, "rows": len(df), "columns": list(df.columns)}, f, indent=2)
+    return path
+
+def load_ride_features(ride_name, columns=None, exclude=None, side_tables=None):
+    """
+    Load a ride's feature table from the store, materialising it first if needed.
+    `columns` selects columns to read; `exclude` reads every column except these.
+    """
+    path = materialise_ride_features(ride_name, side_tables)
+    if columns is None and exclude:
+        with open(_meta_path(ride_name)) as f:
+            all_columns = json.load(f)["columns"]
+        columns = [c for c in all_columns if c not in exclude]
+    return pd.read_parquet(path, columns=columns)
+
+def load_pooled_features(ride_names, exclude=None, side_tables=None):
+    """
+    Feature tables of several rides stacked into one, with a "ride" column, in time order
+    (so a shuffle=False split still holds out the latest readings of every ride).
+    """
+    frames = []
+    for ride in ride_names:
+        df = load_ride_features(ride, exclude=exclude, side_tables=side_tables)
+        df.insert(0, "ride", ride)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values(["datetime", "ride"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,87 @@
+import os
+import joblib
+from feature_store import data_fingerprint, ride_source_paths, shared_source_paths
+
+# Registry of fitted ride models, stored next to the existing pickles in models/<ride>_gb_model.
+# Each bundle holds the fitted preprocessor, the estimator and a fingerprint of the training
+# data, so a model is only retrained when one of its input files has changed.
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(current_dir, "..", "models")
+
+# Bump whenever the bundle layout or model pipeline changes so old bundles are retrained
+REGISTRY_VERSION = 1
+
+# registry name of the one model trained on every ride's pooled features (train_all_rides.py --shared)
+SHARED_MODEL = "all_rides"
+
+def model_dir(ride_name):
+    return os.path.join(MODELS_DIR, f"{ride_name}_gb_model")
+
+def bundle_path(ride_name):
+    return os.path.join(model_dir(ride_name), f"best_{ride_name}_gb_bundle.pkl")
+
+def load_bundle(ride_name, fingerprint=None, backend=None):
+    """
+    Return the stored bundle for a ride, or None if there is none, it was trained
+    on different data than `fingerprint`, or with a different estimator `backend`.
+    """
+    path = bundle_path(ride_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = joblib.load(path)
+    except Exception as e:
+        print(f"Could not load model bundle {path}: {e}")
+        return None
+    if bundle.get("version") != REGISTRY_VERSION:
+        return None
+    if fingerprint is not None and bundle.get("fingerprint") != fingerprint:
+        return None
+    if backend is not None and bundle.get("backend") != backend:
+        return None
+    return bundle
+
+def save_bundle(ride_name, model, preprocessor, fingerprint, metrics=None, backend="gb", rides=None):
+    subfolder = model_dir(ride_name)
+    os.makedirs(subfolder, exist_ok=True)
+    bundle = {
+        "version": REGISTRY_VERSION,
+        "ride": ride_name,
+        "model": model,
+        "preprocessor": preprocessor,
+        "fingerprint": fingerprint,
+        "backend": backend,
+        "metrics": metrics or {},
+        # rides a shared model was trained on
+        "rides": rides or [ride_name],
+    }
+    # write to a temp file first so a crashed save never leaves a half-written bundle
+    path = bundle_path(ride_name)
+    tmp_path = path + ".tmp"
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    return bundle
+
+def load_or_train(ride_name, train_fn, backend="gb"):
+    """
+    Load an up-to-date bundle for the ride, retraining with `train_fn(ride_name)` only
+    when the input files changed. `train_fn` returns (model, preprocessor, metrics).
+    """
+    fingerprint = data_fingerprint(ride_source_paths(ride_name))
+    bundle = load_bundle(ride_name, fingerprint, backend)
+    if bundle is not None:
+        return bundle, False
+    model, preprocessor, metrics = train_fn(ride_name)
+    bundle = save_bundle(ride_name, model, preprocessor, fingerprint, metrics, backend)
+    return bundle, True
+
+def load_shared_bundle():
+    """
+    Return the shared multi-ride bundle, or None if there is none or the data of any of
+    the rides it was trained on has changed since.
+    """
+    bundle = load_bundle(SHARED_MODEL)
+    if bundle is None or bundle.get("fingerprint") != data_fingerprint(shared_source_paths(bundle["rides"])):
+        return None
+    return bundle
@@ -0,0 +1,145 @@
+import numpy as np
+from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.impute import SimpleImputer
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.model_selection import RandomizedSearchCV, HalvingRandomSearchCV
+from sklearn.inspection import permutation_importance
+from xgboost import XGBRegressor
+
+# Estimator backends for the ride wait time models.
+#   gb  - GradientBoostingRegressor tuned with RandomizedSearchCV (original setup)
+#   hgb - HistGradientBoostingRegressor with validation early stopping, tuned with successive halving
+#   xgb - XGBoost "hist" trees with validation early stopping, tuned with successive halving
+
+BACKENDS = ["gb", "hgb", "xgb"]
+DEFAULT_BACKEND = "gb"
+
+# share of the (time ordered) training rows held out for XGBoost early stopping
+XGB_VALIDATION_FRACTION = 0.1
+
+param_grids = {
+    "gb": {
+        "n_estimators": [50, 500],
+        "learning_rate": [0.05, 0.1],
+        "max_depth": [3, 5],
+        "min_samples_split": [2, 5]
+    },
+    "hgb": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+        "max_depth": [None, 5, 8],
+        "min_samples_leaf": [20, 50, 100],
+        "l2_regularization": [0.0, 0.1, 1.0]
+    },
+    "xgb": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_depth": [3, 5, 7],
+        "min_child_weight": [1, 5, 10],
+        "subsample": [0.8, 1.0],
+        "colsample_bytree": [0.8, 1.0]
+    }
+}
+
+def build_preprocessor(X):
+    """
+    Scale numeric columns and one-hot encode wind direction (and the ride, for models
+    trained on several rides). Output is always dense, since the histogram backends do
+    not accept sparse input.
+    """
+    categorical_cols = [c for c in ["wind_direction", "ride"] if c in X.columns]
+    numeric_cols = [
+        c for c in X.columns
+        if c not in categorical_cols
+        and X[c].dtype in [np.float64, np.int64]
+    ]
+    numeric_transformer = Pipeline([
+        ("imputer", SimpleImputer(strategy="mean")),
+        ("scaler",  StandardScaler())
+    ])
+    categorical_transformer = Pipeline([
+        ("imputer", SimpleImputer(strategy="constant", fill_value="missing")),
+        ("onehot", OneHotEncoder(handle_unknown="ignore"))
+    ])
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ("num", numeric_transformer, numeric_cols),
+            ("cat", categorical_transformer, categorical_cols)
+        ],
+        remainder="drop",
+        sparse_threshold=0
+    )
+    return preprocessor, numeric_cols, categorical_cols
+
+def make_search(backend=DEFAULT_BACKEND, n_jobs=-1, random_state=42, param_grid=None):
+    # param_grid overrides param_grids[backend]
+    if param_grid is None:
+        param_grid = param_grids.get(backend)
+    if backend == "gb":
+        return RandomizedSearchCV(
+            GradientBoostingRegressor(random_state=random_state),
+            param_distributions=param_grid,
+            n_iter=5,
+            cv=3,
+            scoring="neg_mean_squared_error",
+            random_state=random_state,
+            n_jobs=n_jobs
+        )
+    if backend == "hgb":
+        model = HistGradientBoostingRegressor(
+            max_iter=500,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            random_state=random_state
+        )
+    elif backend == "xgb":
+        model = XGBRegressor(
+            tree_method="hist",
+            n_estimators=1000,
+            early_stopping_rounds=20,
+            random_state=random_state,
+            n_jobs=1,
+            verbosity=0
+        )
+    else:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    # successive halving: every candidate starts on a small sample, only the best get more rows
+    return HalvingRandomSearchCV(
+        model,
+        param_distributions=param_grid,
+        n_candidates=12,
+        factor=3,
+        resource="n_samples",
+        cv=3,
+        scoring="neg_mean_squared_error",
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+
+def fit_ride_estimator(X_train, y_train, backend=DEFAULT_BACKEND, n_jobs=-1, param_grid=None):
+    """
+    Tune and fit the chosen backend on preprocessed training rows (kept in time order).
+    param_grid replaces the backend's default search space in param_grids.
+    Returns the fitted search; use .best_estimator_ and .best_params_.
+    """
+    search = make_search(backend, n_jobs, param_grid=param_grid)
+    y_train = np.asarray(y_train)
+    if backend == "xgb":
+        # the last rows of the training period act as the early-stopping validation set
+        n_val = max(1, int(len(y_train) * XGB_VALIDATION_FRACTION))
+        X_fit, X_val = X_train[:-n_val], X_train[-n_val:]
+        y_fit, y_val = y_train[:-n_val], y_train[-n_val:]
+        search.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    else:
+        search.fit(X_train, y_train)
+    return search
+
+def feature_importances(model, X_test, y_test, n_rows=5000):
+    # Impurity importances where the backend has them, permutation importances otherwise
+    if hasattr(model, "feature_importances_"):
+        return model.feature_importances_
+    result = permutation_importance(model, X_test[:n_rows], np.asarray(y_test)[:n_rows], n_repeats=3, random_state=42)
+    return result.importances_mean
@@ -0,0 +1,155 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from feature_store import (LAG_FEATURES, DATA_DIR, load_side_tables, join_side_tables, finalise_features,
+                           load_ride_features, data_fingerprint, ride_source_paths)
+from model_registry import load_bundle, load_shared_bundle
+
+# Recursive 5-minute forecasts for days with no observed wait times.
+# The weather/holiday/event/time-of-day part of the feature matrix is built and transformed
+# once for the whole day; only the four lag columns change between steps, so they
+# are rolled forward from the previous predictions for all rides at once and written
+# straight into the transformed rows. Each step is recursive (it needs the previous step's
+# predictions), so rides that share a model are stacked into one predict call per step.
+# With the shared multi-ride model (train_all_rides.py --shared) that is every ride, i.e.
+# one predict per step; rides it does not cover fall back to their own model.
+
+# longest window among the lag features (wait_time_rolling6)
+HISTORY_STEPS = 6
+# ride readings cover 06:00 to 23:55
+DEFAULT_OPEN_HOUR = 6
+DEFAULT_CLOSE_HOUR = 23
+
+def day_grid(date, open_hour=DEFAULT_OPEN_HOUR, close_hour=DEFAULT_CLOSE_HOUR):
+    start = pd.Timestamp(date).normalize() + pd.Timedelta(hours=open_hour)
+    return pd.date_range(start, periods=(close_hour - open_hour + 1) * 12, freq="5min")
+
+def exogenous_features(times, side_tables=None):
+    # weather, rainfall, holiday and event columns for a grid of future timestamps
+    df = pd.DataFrame({"datetime": times})
+    return finalise_features(join_side_tables(df, side_tables))
+
+def seed_history(df_data, start, steps=HISTORY_STEPS):
+    """
+    Last `steps` observed wait times before `start`, located by binary search on the
+    (sorted) datetime column. Short histories are padded with their oldest value.
+    """
+    times = df_data["datetime"].to_numpy()
+    end = np.searchsorted(times, np.datetime64(start), side="left")
+    seed = df_data["wait_time"].to_numpy(dtype=float)[max(0, end - steps):end]
+    if len(seed) == 0:
+        return np.zeros(steps)
+    return np.concatenate([np.full(steps - len(seed), seed[0]), seed])
+
+def lag_matrix(history):
+    # (rides, HISTORY_STEPS) history, newest last -> (rides, 4) in LAG_FEATURES order
+    return np.column_stack([
+        history[:, -1],
+        history[:, -2],
+        history[:, -3:].mean(axis=1),
+        history.mean(axis=1),
+    ])
+
+def _lag_slots(preprocessor):
+    """
+    Columns of the lag features in the transformed matrix, with the scaler's mean and
+    scale for them, so the lag values can be updated without calling transform again.
+    """
+    _, numeric_pipeline, numeric_cols = preprocessor.transformers_[0]
+    numeric_cols = list(numeric_cols)
+    missing = [c for c in LAG_FEATURES if c not in numeric_cols]
+    if missing:
+        raise ValueError(f"Preprocessor has no numeric columns for {missing}")
+    idx = np.array([numeric_cols.index(c) for c in LAG_FEATURES])
+    scaler = numeric_pipeline.named_steps["scaler"]
+    return idx, scaler.mean_[idx], scaler.scale_[idx]
+
+def forecast_day(rides, date, open_hour=DEFAULT_OPEN_HOUR, close_hour=DEFAULT_CLOSE_HOUR, side_tables=None):
+    """
+    Forecast every 5-minute slot of `date` for several rides at once.
+    rides: dict of ride_name -> (model, preprocessor, df_data), where df_data holds the
+    ride's observed "datetime" and "wait_time" sorted by time.
+    Returns a long frame with columns ride, datetime, PredictedWait.
+    """
+    times = day_grid(date, open_hour, close_hour)
+    exog = exogenous_features(times, side_tables)
+    names = list(rides)
+
+    # rides sharing one fitted model and preprocessor form a group: their feature rows are
+    # transformed in one call and predicted in one call per step
+    members_by_model = {}
+    for r, name in enumerate(names):
+        model, preproc, _ = rides[name]
+        members_by_model.setdefault((id(model), id(preproc)), []).append(r)
+    groups = []
+    for members in members_by_model.values():
+        model, preproc, _ = rides[names[members[0]]]
+        X = exog.reindex(columns=preproc.feature_names_in_, fill_value=0)
+        if "ride" in X.columns:
+            # shared model: the ride is a feature, so stack one copy of the day per ride
+            X = pd.concat([X.assign(ride=names[r]) for r in members], ignore_index=True)
+        elif len(members) > 1:
+            X = pd.concat([X] * len(members), ignore_index=True)
+        # (rides, steps, features) block of transformed rows
+        block = np.array(preproc.transform(X), dtype=float).reshape(len(members), len(times), -1)
+        groups.append((model, np.array(members), block, *_lag_slots(preproc)))
+
+    history = np.vstack([seed_history(rides[name][2], times[0]) for name in names])
+    preds = np.zeros((len(names), len(times)))
+    for step in range(len(times)):
+        lags = lag_matrix(history)
+        for model, members, block, idx, mean, scale in groups:
+            rows = block[:, step, :]
+            rows[:, idx] = (lags[members] - mean) / scale
+            preds[members, step] = model.predict(rows)
+        preds[:, step] = np.maximum(preds[:, step], 0)
+        history = np.column_stack([history[:, 1:], preds[:, step]])
+
+    return pd.DataFrame({
+        "ride": np.repeat(names, len(times)),
+        "datetime": np.tile(times, len(names)),
+        "PredictedWait": preds.ravel(),
+    })
+
+def load_registered_rides(ride_names):
+    # (model, preprocessor, history) for each ride with an up-to-date shared or own model
+    shared = load_shared_bundle()
+    if shared is not None:
+        print(f"Using the shared model for {len(set(ride_names) & set(shared['rides']))} rides")
+    rides = {}
+    for ride in ride_names:
+        if shared is not None and ride in shared["rides"]:
+            bundle = shared
+        else:
+            bundle = load_bundle(ride, data_fingerprint(ride_source_paths(ride)))
+        if bundle is None:
+            print(f"Skipping {ride}: no up-to-date model in the registry")
+            continue
+        history = load_ride_features(ride, columns=["datetime", "wait_time"])
+        rides[ride] = (bundle["model"], bundle["preprocessor"], history)
+    return rides
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast a full day of 5-minute wait times for all rides")
+    parser.add_argument("date", help="day to forecast (YYYY-MM-DD)")
+    parser.add_argument("--rides", nargs="+", help="ride file names (default: every ride in rides_keys.csv)")
+    parser.add_argument("--output", help="CSV file to write the forecast to")
+    args = parser.parse_args()
+
+    ride_names = args.rides
+    if ride_names is None:
+        ridedf = pd.read_csv(f"{DATA_DIR}/uss_attraction_details/rides_keys.csv", on_bad_lines="skip")
+        ride_names = ridedf["file_name"].dropna().unique().tolist()
+    rides = load_registered_rides(ride_names)
+    if not rides:
+        raise SystemExit("No trained rides to forecast; run train_all_rides.py first.")
+
+    side_tables = load_side_tables()
+    start = time.perf_counter()
+    forecast = forecast_day(rides, args.date, side_tables=side_tables)
+    print(f"Forecast {len(rides)} rides for {args.date} in {time.perf_counter() - start:.2f}s")
+    if args.output:
+        forecast.to_csv(args.output, index=False)
+    else:
+        print(forecast.groupby("ride")["PredictedWait"].describe().to_string())
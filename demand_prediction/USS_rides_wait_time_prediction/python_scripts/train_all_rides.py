@@ -0,0 +1,156 @@
+import argparse
+import os
+import time
+from math import sqrt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+matplotlib.use("Agg")  # workers only save figures, never display them
+import pandas as pd
+from joblib import parallel_backend
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from threadpoolctl import threadpool_limits
+import feature_store
+from feature_store import (DATA_DIR, load_side_tables, ride_data_path, has_ride_readings,
+                           load_pooled_features, data_fingerprint, shared_source_paths)
+from model_registry import MODELS_DIR, SHARED_MODEL, model_dir, save_bundle
+from data_processing_modelling_w_input import train_ride_model
+from ride_estimators import BACKENDS, DEFAULT_BACKEND, build_preprocessor, fit_ride_estimator
+
+# Trains a wait time model for every ride in rides_keys.csv on a process pool.
+# The side tables are parsed once in the parent and handed to each worker, and the
+# hyperparameter search inside each worker is capped so workers x n_jobs <= CPU count.
+# Estimators run single-threaded inside a worker (HistGradientBoosting would otherwise
+# start one OpenMP thread per CPU in every worker and every search process).
+# With --shared, one model is trained instead on all rides' pooled feature tables, with the
+# ride as a one-hot feature; ride_forecaster.py then predicts every ride in one call per step.
+
+rides_keys_path = os.path.join(DATA_DIR, "uss_attraction_details", "rides_keys.csv")
+
+# the pooled table has every ride's rows, too many for the "gb" search, and XGBoost predicts
+# a few rows far faster than HistGradientBoosting (which loops over its trees in Python),
+# which is what the recursive forecast does once per 5-minute step
+SHARED_DEFAULT_BACKEND = "xgb"
+
+def load_ride_names():
+    ridedf = pd.read_csv(rides_keys_path, on_bad_lines="skip")
+    return ridedf["file_name"].dropna().unique().tolist()
+
+def available_rides(ride_names=None):
+    # rides (default: all of rides_keys.csv) that have wait time readings to train on
+    if ride_names is None:
+        ride_names = load_ride_names()
+    available = [r for r in ride_names if has_ride_readings(r)]
+    for ride in sorted(set(ride_names) - set(available)):
+        print(f"Skipping {ride}: no partitions and no file at {ride_data_path(ride)}")
+    return available
+
+def split_cpus(n_rides, workers=None):
+    # Returns (process workers, n_jobs per worker) without oversubscribing the machine
+    cpus = os.cpu_count() or 1
+    if workers is None:
+        workers = min(n_rides, cpus)
+    workers = max(1, min(workers, n_rides))
+    return workers, max(1, cpus // workers)
+
+def _init_worker(side_tables):
+    # share the parent's parsed side tables instead of re-reading the CSVs in every worker
+    feature_store._side_tables = side_tables
+
+def _train_one(ride_name, n_jobs, backend):
+    start = time.perf_counter()
+    # the n_jobs search processes are the worker's whole CPU share: one thread each,
+    # both in this process and in the joblib processes the search starts
+    with threadpool_limits(limits=1), parallel_backend("loky", inner_max_num_threads=1):
+        metrics = train_ride_model(ride_name, n_jobs=n_jobs, backend=backend)
+    return {"ride": ride_name, **metrics, "Train Seconds": time.perf_counter() - start}
+
+def train_all_rides(ride_names=None, workers=None, backend=DEFAULT_BACKEND):
+    """
+    Train every ride (default: all of rides_keys.csv) in parallel and return a metrics table.
+    Rides with neither Parquet partitions nor a merged wait time CSV are skipped.
+    """
+    available = available_rides(ride_names)
+    if not available:
+        return pd.DataFrame()
+
+    workers, n_jobs = split_cpus(len(available), workers)
+    print(f"Training {len(available)} rides on {workers} workers (n_jobs={n_jobs} each)")
+    side_tables = load_side_tables()
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(side_tables,)) as pool:
+        futures = {pool.submit(_train_one, ride, n_jobs, backend): ride for ride in available}
+        for future in as_completed(futures):
+            ride = futures[future]
+            try:
+                rows.append(future.result())
+                print(f"Finished {ride}")
+            except Exception as e:
+                print(f"Failed to train {ride}: {e}")
+                rows.append({"ride": ride, "Error": str(e)})
+
+    summary = pd.DataFrame(rows).sort_values("ride").reset_index(drop=True)
+    summary.to_csv(os.path.join(MODELS_DIR, "all_rides_metrics.csv"), index=False)
+    return summary
+
+def train_shared_model(ride_names=None, backend=SHARED_DEFAULT_BACKEND, n_jobs=-1):
+    """
+    Train one model on the pooled feature tables of every ride (default: all of
+    rides_keys.csv), with the ride one-hot encoded, and register it as SHARED_MODEL.
+    Returns the metrics.
+    """
+    available = available_rides(ride_names)
+    if not available:
+        return {}
+    side_tables = load_side_tables()
+    fingerprint = data_fingerprint(shared_source_paths(available))
+    df = load_pooled_features(available, exclude=["date"], side_tables=side_tables)
+    print(f"Training one {backend} model on {len(df)} readings of {len(available)} rides")
+
+    X = df.drop(columns=["datetime", "valid_end", "wait_time"], errors="ignore")
+    y = df["wait_time"]
+    preprocessor, _, _ = build_preprocessor(X)
+    X_processed = preprocessor.fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_processed, y, test_size=0.2, shuffle=False)
+
+    start = time.perf_counter()
+    rs = fit_ride_estimator(X_train, y_train, backend=backend, n_jobs=n_jobs)
+    fit_seconds = time.perf_counter() - start
+    best_model = rs.best_estimator_
+    y_pred_train = best_model.predict(X_train)
+    y_pred_test = best_model.predict(X_test)
+    results = {
+        "Backend": backend,
+        "Best Params": rs.best_params_,
+        "Train RMSE": sqrt(mean_squared_error(y_train, y_pred_train)),
+        "Train R2": r2_score(y_train, y_pred_train),
+        "Test RMSE": sqrt(mean_squared_error(y_test, y_pred_test)),
+        "Test R2": r2_score(y_test, y_pred_test),
+        "Fit Seconds": fit_seconds
+    }
+
+    save_bundle(SHARED_MODEL, best_model, preprocessor, fingerprint, results, backend, rides=available)
+    pd.DataFrame([{"ride": SHARED_MODEL, **results}]).to_csv(
+        os.path.join(model_dir(SHARED_MODEL), f"best_{SHARED_MODEL}_gb_metrics.csv"), index=False
+    )
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train wait time models for all rides in rides_keys.csv")
+    parser.add_argument("--rides", nargs="+", help="ride file names to train (default: every ride)")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--backend", choices=BACKENDS,
+                        help=f"estimator backend (default: {DEFAULT_BACKEND}, or {SHARED_DEFAULT_BACKEND} with --shared)")
+    parser.add_argument("--shared", action="store_true",
+                        help="train one model on all rides' pooled data instead of one model per ride")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.shared:
+        results = train_shared_model(args.rides, args.backend or SHARED_DEFAULT_BACKEND)
+        print(pd.Series(results).to_string())
+    else:
+        summary = train_all_rides(args.rides, args.workers, args.backend or DEFAULT_BACKEND)
+        print(summary.to_string(index=False))
+    print(f"Trained all rides in {time.perf_counter() - start:.1f}s")
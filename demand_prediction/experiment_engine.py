@@ -0,0 +1,327 @@
+import hashlib
+import os
+import time
+from datetime import datetime
+from math import sqrt
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import StandardScaler
+from sklearn.impute import SimpleImputer
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.linear_model import LinearRegression, Ridge, Lasso
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.svm import SVR
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split, RandomizedSearchCV
+from sklearn.feature_selection import VarianceThreshold
+from sklearn.decomposition import PCA
+from sklearn.base import clone
+from xgboost import XGBRegressor
+
+# Experiment engine shared by the daily attendance and daily wait time model grids.
+# A target is described by a config dict (target column, target CSV, lag feature prefix,
+# output folders). run_experiment loads and merges the daily sources (cached on disk
+# until a source file changes), builds the features, fits every model x scenario pair
+# once in parallel and records timings and metrics for each run.
+
+current_dir = os.path.dirname(__file__)
+DATA_DIR = os.path.join(current_dir, "..", "data")
+CACHE_DIR = os.path.join(current_dir, "experiment_cache")
+
+# daily external factors merged onto every target
+weather_path = os.path.join(DATA_DIR, "Meteorological", "datasets", "final_data", "merged_weather_data_clean.csv")
+school_holidays_path = os.path.join(DATA_DIR, "Events", "Holidays", "datasets", "daily_school_holidays_combined_updated.csv")
+events_path = os.path.join(DATA_DIR, "Events", "EventData", "supplementary_event_data_2016_2025.csv")
+
+ATTENDANCE_CONFIG = {
+    'name': 'attendance',
+    'target': 'USSAttendance',
+    'target_path': os.path.join(DATA_DIR, "singapore_tourism_data", "Final", "synthetic_data_daily_attendance", "synthetic_daily_attendance_2017_2025.csv"),
+    'lag_prefix': 'attdn',
+    'drop_columns': ['Prediction', 'Delta', 'Comment', 'forecast_text', 'actual_date', 'forecast_day'],
+    'models_dir': os.path.join(current_dir, "USS_daily_attendance_counts_prediction", "models"),
+    'metrics_dir': os.path.join(current_dir, "USS_daily_attendance_counts_prediction", "evaluation_metrics"),
+}
+
+WAIT_TIME_CONFIG = {
+    'name': 'wait_time',
+    'target': 'Actual',
+    'target_path': os.path.join(DATA_DIR, "uss_wait_times", "augmented_wait_time_data", "2017_to_2025_synthetic_wait_times_final.csv"),
+    'lag_prefix': 'wait_time',
+    'drop_columns': ['Prediction', 'Delta', 'Comment', 'forecast_text', 'actual_date', 'forecast_day'],
+    'models_dir': os.path.join(current_dir, "USS_general_daily_wait_time_prediction", "models"),
+    'metrics_dir': os.path.join(current_dir, "USS_general_daily_wait_time_prediction", "evaluation_metrics"),
+}
+
+model_params = {
+    'Linear Regression': {
+        'model': LinearRegression(),
+        'params': {}
+    },
+    'Ridge Regression': {
+        'model': Ridge(),
+        'params': {'alpha': [0.1, 1.0, 10.0]}
+    },
+    'Lasso Regression': {
+        'model': Lasso(),
+        'params': {'alpha': [0.01, 0.1, 1.0]}
+    },
+    'Support Vector Regression': {
+        'model': SVR(),
+        'params': {'C': [0.1, 1, 10], 'epsilon': [0.1, 0.2, 0.5]}
+    },
+    'Gradient Boosting': {
+        'model': GradientBoostingRegressor(random_state=42),
+        'params': {'n_estimators': [100, 200], 'learning_rate': [0.05, 0.1], 'max_depth': [3, 5]}
+    },
+    'Random Forest': {
+        'model': RandomForestRegressor(random_state=42),
+        'params': {'n_estimators': [100, 200], 'max_depth': [10, 20], 'min_samples_split': [2, 5]}
+    },
+    'XGBoost': {
+        'model': XGBRegressor(random_state=42, verbosity=0),
+        'params': {'n_estimators': [100, 200], 'learning_rate': [0.05, 0.1], 'max_depth': [3, 5]}
+    }
+}
+
+SCENARIOS = ['Base', 'VarianceThreshold', 'PCA', 'VarianceThreshold+PCA']
+
+def source_fingerprint(paths):
+    # changes whenever any source file is replaced or edited
+    h = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        h.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+def merge_daily_sources(target_path):
+    target_df = pd.read_csv(target_path)
+    weather_df = pd.read_csv(weather_path)
+    school_holidays_df = pd.read_csv(school_holidays_path)
+    events_df = pd.read_csv(events_path)
+
+    target_df['Date'] = pd.to_datetime(target_df['Date'])
+    weather_df['date'] = pd.to_datetime(weather_df['date'], format='%d/%m/%Y')
+    school_holidays_df['date'] = pd.to_datetime(school_holidays_df['date'], format='%d/%m/%Y')
+    events_df['Date'] = pd.to_datetime(events_df['Date'], dayfirst=True, errors='coerce')
+    events_df = events_df.dropna(subset=['Date'])
+
+    df = target_df.copy()
+    df = df.merge(weather_df, left_on='Date', right_on='date', how='left')
+    df = df.merge(school_holidays_df[['date', 'holiday_flag']], left_on='Date', right_on='date', how='left')
+    df = df.merge(events_df.drop(columns=['Event_Description']), on='Date', how='left')
+    if 'date' in df.columns:
+        df.drop(columns=['date'], inplace=True)
+    return df
+
+def load_merged_daily(config):
+    """
+    Target CSV merged with weather, school holidays and events, read from the on-disk
+    cache unless one of the source files changed since it was written.
+    """
+    sources = [config['target_path'], weather_path, school_holidays_path, events_path]
+    path = os.path.join(CACHE_DIR, f"{config['name']}_{source_fingerprint(sources)}.pkl")
+    if os.path.exists(path):
+        return pd.read_pickle(path)
+    df = merge_daily_sources(config['target_path'])
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return df
+
+def featurise(df, config):
+    df = df.copy()
+    target = config['target']
+    prefix = config['lag_prefix']
+
+    df['day_of_week'] = df['Date'].dt.dayofweek
+    weekday_ohe = pd.get_dummies(df['day_of_week'], prefix='weekday')
+    df = pd.concat([df, weekday_ohe], axis=1)
+    df['is_weekend'] = df['day_of_week'].isin([5, 6]).astype(int)
+    df.drop(columns=['day_of_week'], inplace=True)
+
+    non_datetime_cols = df.select_dtypes(exclude=['datetime']).columns
+    df[non_datetime_cols] = df[non_datetime_cols].fillna(0)
+
+    df.drop(columns=[col for col in config['drop_columns'] if col in df.columns], inplace=True)
+
+    # Add time-based and interaction features
+    df['month'] = df['Date'].dt.month
+    df['week_of_year'] = df['Date'].dt.isocalendar().week
+    if 'holiday_flag' in df.columns:
+        df['is_holiday_weekend'] = df['is_weekend'] * df['holiday_flag']
+    if 'rainfall' in df.columns and 'wind_speed' in df.columns:
+        df['rain_and_wind'] = df['rainfall'] * df['wind_speed']
+
+    # Lag and rolling features (requires sorting), this would be good for 7 days basis
+    df = df.sort_values('Date')
+    df[f'{prefix}_lag_1'] = df[target].shift(1)
+    df[f'{prefix}_roll_mean_3'] = df[target].rolling(window=3).mean()
+    df[f'{prefix}_roll_std_5'] = df[target].rolling(window=5).mean()
+    df[f'{prefix}_roll_std_7'] = df[target].rolling(window=7).std()
+    df.fillna(0, inplace=True)
+
+    X = df.drop(columns=['Date', target])
+    y = df[target]
+    X['forecast_summary'] = X['forecast_summary'].fillna("missing").astype(str)
+    return X, y
+
+def build_preprocessor(X):
+    numeric_features = X.drop(columns=['forecast_summary']).select_dtypes(include=[np.number]).columns.tolist()
+    numeric_transformer = Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='mean')),
+        ('scaler', StandardScaler())
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ('tfidf', TfidfVectorizer(max_features=30))
+    ])
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, numeric_features),
+            ('cat', categorical_transformer, 'forecast_summary')
+        ]
+    )
+    return preprocessor, numeric_features
+
+def build_scenarios(X_train, X_test):
+    # (train, test, fitted feature steps) for each preprocessing scenario
+    selector = VarianceThreshold(threshold=0.01)
+    X_train_vt = selector.fit_transform(X_train)
+    X_test_vt = selector.transform(X_test)
+
+    pca = PCA(n_components=0.95, random_state=42)  # Retain 95% variance
+    X_train_pca = pca.fit_transform(X_train)
+    X_test_pca = pca.transform(X_test)
+
+    pca_vt = PCA(n_components=0.95, random_state=42)
+    X_train_vt_pca = pca_vt.fit_transform(X_train_vt)
+    X_test_vt_pca = pca_vt.transform(X_test_vt)
+
+    return {
+        'Base': (X_train, X_test, []),
+        'VarianceThreshold': (X_train_vt, X_test_vt, [('selector', selector)]),
+        'PCA': (X_train_pca, X_test_pca, [('pca', pca)]),
+        'VarianceThreshold+PCA': (X_train_vt_pca, X_test_vt_pca, [('selector', selector), ('pca', pca_vt)])
+    }
+
+def scenario_pipeline(preprocessor, steps, model):
+    # end-to-end Pipeline from already fitted steps: raw features in, predictions out
+    return Pipeline([('preprocessor', preprocessor), *steps, ('model', model)])
+
+def load_pipeline(config, key):
+    # e.g. load_pipeline(ATTENDANCE_CONFIG, "Gradient Boosting (Base)"); only call predict on it
+    path = model_path(config, key)
+    pipeline = joblib.load(path)
+    if not isinstance(pipeline, Pipeline):
+        # models saved before the preprocessing was bundled into the pickle
+        script = "preprocessing_modelling_attdn.py" if config is ATTENDANCE_CONFIG else "preprocessing_and_modelling.py"
+        raise TypeError(
+            f"{path} holds a bare {type(pipeline).__name__}, not a fitted Pipeline. "
+            f"Re-run {script} to regenerate the {config['name']} models."
+        )
+    return pipeline
+
+def fit_and_evaluate(name, mp, scenario_name, train_set, test_set, y_train, y_test, n_jobs):
+    # Tune and fit one (model, scenario) pair once; this exact estimator is the one saved
+    start = time.perf_counter()
+    if mp['params']:
+        search = RandomizedSearchCV(clone(mp['model']), mp['params'], n_iter=5, cv=3, scoring='neg_mean_squared_error', random_state=42, n_jobs=n_jobs)
+        search.fit(train_set, y_train)
+        model = search.best_estimator_
+        best_params = search.best_params_
+    else:
+        model = clone(mp['model'])
+        model.fit(train_set, y_train)
+        best_params = 'Default'
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_train_pred = model.predict(train_set)
+    y_test_pred = model.predict(test_set)
+    predict_seconds = time.perf_counter() - start
+
+    metrics = {
+        'Model': name,
+        'Scenario': scenario_name,
+        'Train RMSE': sqrt(mean_squared_error(y_train, y_train_pred)),
+        'Train R2': r2_score(y_train, y_train_pred),
+        'Test RMSE': sqrt(mean_squared_error(y_test, y_test_pred)),
+        'Test R2': r2_score(y_test, y_test_pred),
+        'Best Params': best_params,
+        'Fit Seconds': fit_seconds,
+        'Predict Seconds': predict_seconds
+    }
+    return f"{name} ({scenario_name})", model, metrics
+
+def model_path(config, key):
+    return os.path.join(config['models_dir'], f"{key.replace(' ', '_').replace('(', '').replace(')', '')}.pkl")
+
+def run_experiment(config, models=None, scenarios=None, workers=None):
+    """
+    Fit every model x scenario pair (default: all of model_params and SCENARIOS) for the
+    configured target. Each pair is saved to config['models_dir'] as one fitted Pipeline
+    (preprocessor, scenario steps, model) that takes raw featurised rows; the results table
+    (metrics plus load / featurise / fit / predict seconds per pair) is saved to
+    config['metrics_dir'] and appended to its experiment_runs.csv log.
+    Returns a dict with the results table, fitted models and pipelines and the test split.
+    """
+    models = models or list(model_params)
+    scenarios = scenarios or SCENARIOS
+
+    start = time.perf_counter()
+    df = load_merged_daily(config)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X, y = featurise(df, config)
+    preprocessor, numeric_features = build_preprocessor(X)
+    X_processed = preprocessor.fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_processed, y, test_size=0.2, random_state=42)
+    scenario_sets = build_scenarios(X_train, X_test)
+    featurise_seconds = time.perf_counter() - start
+
+    os.makedirs(config['models_dir'], exist_ok=True)
+
+    # model x scenario pairs run in parallel; each search gets an equal share of the CPUs
+    jobs = [(name, scenario_name) for scenario_name in scenarios for name in models]
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(jobs)))
+    n_jobs = max(1, cpus // workers)
+    print(f"[{config['name']}] Fitting {len(jobs)} model/scenario pairs on {workers} workers (n_jobs={n_jobs} each)")
+    results = joblib.Parallel(n_jobs=workers)(
+        joblib.delayed(fit_and_evaluate)(name, model_params[name], scenario_name, *scenario_sets[scenario_name][:2], y_train, y_test, n_jobs)
+        for name, scenario_name in jobs
+    )
+
+    model_store = {}
+    pipelines = {}
+    rows = []
+    for key, model, metrics in results:
+        pipelines[key] = scenario_pipeline(preprocessor, scenario_sets[metrics['Scenario']][2], model)
+        joblib.dump(pipelines[key], model_path(config, key))
+        model_store[key] = model
+        rows.append({'Target': config['target'], 'Load Seconds': load_seconds, 'Featurise Seconds': featurise_seconds, **metrics})
+
+    table = pd.DataFrame(rows)
+    table['Best Params'] = table['Best Params'].astype(str)
+    os.makedirs(config['metrics_dir'], exist_ok=True)
+    table.to_csv(os.path.join(config['metrics_dir'], "model_comparison_metrics_2017_2025.csv"), index=False)
+    runs_path = os.path.join(config['metrics_dir'], "experiment_runs.csv")
+    table.assign(Run=datetime.now().isoformat(timespec='seconds')).to_csv(
+        runs_path, mode='a', header=not os.path.exists(runs_path), index=False
+    )
+
+    return {
+        'results': table,
+        'models': model_store,
+        'pipelines': pipelines,
+        'preprocessor': preprocessor,
+        'numeric_features': numeric_features,
+        'feature_columns': X.columns.tolist(),
+        'X_test': X_test,
+        'y_test': y_test
+    }
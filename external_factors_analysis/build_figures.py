@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import runpy
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from data import DATASETS, ROOT_DIR
+
+# Headless, incremental build of the analysis figures.
+# Each analysis script is one build unit: its fingerprint covers the script source, the
+# shared data.py / day_classifier.py code and the size and mtime of every dataset it
+# imports from data.py. Figures whose fingerprint matches figure_manifest.json and whose
+# PNGs still exist are skipped; the other scripts are run in worker processes with the
+# non-interactive Agg backend, so plt.show() does not block. Each script gets a fresh
+# process, since the scripts modify the shared data.py tables in place.
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(current_dir, "figure_manifest.json")
+
+# Bump to force every figure to be rebuilt (e.g. after a matplotlib / seaborn upgrade)
+BUILD_VERSION = 1
+
+SCRIPTS = [
+    'international_tourist_trends.py',
+    'local_holidays.py',
+    'events.py',
+    'weather.py',
+    'weather_forecast.py',
+]
+SHARED_CODE = ['data.py', 'day_classifier.py']
+
+def script_source(script):
+    with open(os.path.join(current_dir, script), encoding='utf-8') as f:
+        return f.read()
+
+def script_figures(source):
+    # output paths (relative to the repository root) of every plt.savefig call
+    return re.findall(r"savefig\(\s*'([^']+)'", source)
+
+def script_datasets(source):
+    # tables the script imports from data.py
+    match = re.search(r"^from data import (.+)$", source, re.MULTILINE)
+    return sorted(name.strip() for name in match.group(1).split(',')) if match else []
+
+def script_fingerprint(script):
+    """
+    Returns (fingerprint, inputs): a hash of everything the script's figures depend on,
+    and a readable record of those inputs for the manifest.
+    """
+    source = script_source(script)
+    datasets = {}
+    for name in script_datasets(source):
+        stat = os.stat(os.path.join(ROOT_DIR, DATASETS[name][0]))
+        datasets[name] = [stat.st_size, stat.st_mtime_ns]
+    inputs = {
+        'build_version': BUILD_VERSION,
+        'backend': 'Agg',
+        'datasets': datasets,
+    }
+    sha = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode())
+    for code in [script] + SHARED_CODE:
+        sha.update(script_source(code).encode())
+    return sha.hexdigest(), inputs
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+def is_stale(script, fingerprint, manifest):
+    figures = script_figures(script_source(script))
+    recorded = {path: manifest.get(path, {}).get('fingerprint') for path in figures}
+    return any(fp != fingerprint or not os.path.exists(os.path.join(ROOT_DIR, path))
+               for path, fp in recorded.items())
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    warnings.filterwarnings("ignore", message=".*non-interactive.*")
+    # the scripts save figures relative to the repository root and import data.py as a sibling
+    os.chdir(ROOT_DIR)
+    sys.path.insert(0, current_dir)
+
+def render_script(script):
+    # run one analysis script headlessly; returns (captured printout, seconds taken)
+    import matplotlib.pyplot as plt
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        runpy.run_path(os.path.join(current_dir, script), run_name="__main__")
+    plt.close('all')
+    return output.getvalue(), time.perf_counter() - start
+
+def build(scripts=None, force=False, workers=None):
+    scripts = scripts or SCRIPTS
+    manifest = load_manifest()
+    pending = {}
+    for script in scripts:
+        fingerprint, inputs = script_fingerprint(script)
+        if force or is_stale(script, fingerprint, manifest):
+            pending[script] = (fingerprint, inputs)
+        else:
+            print(f"{script}: up to date")
+    if not pending:
+        return manifest
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    print(f"Rendering {len(pending)} scripts on {workers} workers")
+    # max_tasks_per_child=1: a fresh process (and fresh data.py tables) for every script
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(render_script, script): script for script in pending}
+        for future in as_completed(futures):
+            script = futures[future]
+            try:
+                printout, seconds = future.result()
+            except Exception as e:
+                print(f"Failed to render {script}: {e}")
+                continue
+            fingerprint, inputs = pending[script]
+            for path in script_figures(script_source(script)):
+                manifest[path] = {'script': script, 'fingerprint': fingerprint, 'inputs': inputs}
+            save_manifest(manifest)
+            print(f"===== {script} ({seconds:.1f}s) =====")
+            print(printout)
+    return manifest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rebuild the external factors figures whose inputs changed")
+    parser.add_argument("scripts", nargs="*", help=f"only these analysis scripts (default: all of {', '.join(SCRIPTS)})")
+    parser.add_argument("--force", action="store_true", help="render even if the figures are up to date")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    unknown = set(args.scripts) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"unknown scripts: {', '.join(sorted(unknown))}")
+    build(args.scripts, args.force, args.workers)
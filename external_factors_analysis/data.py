@@ -1,48 +1,122 @@
+import contextlib
+import glob
+import os
 import pandas as pd
 
-# tourism data
-tourism = pd.read_csv('data/singapore_tourism_data/Final/tourism_counts/tourism.csv')
-tourism['year_month'] = pd.to_datetime(tourism['year_month'])
-tourism['no_of_visitors'] = pd.to_numeric(tourism['no_of_visitors'], errors='coerce').fillna(0).astype(int)
+# Dataset catalog for the external factors analysis.
+# Tables are loaded on first access, so `from data import weather, wait_time` only reads
+# those two files. Each cleaned table is cached as Parquet in data_cache/ (parsed datetime
+# and numeric columns are kept as typed columns), keyed by the size and mtime of its
+# source CSV, so later runs skip the CSV parsing until the source file changes.
 
-# wait time data
-wait_time = pd.read_csv('data/uss_wait_times/cleaned_data_2022_2025/cleaned_2024_wait_times.csv')
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_cache")
 
-# four day weather forecast data
-four_day_forecast = pd.read_csv('data/Meteorological/datasets/final_data/4_day_weather_forecasts.csv')
+# Bump whenever a cleaning function below changes so cached tables are rebuilt
+CACHE_VERSION = 1
 
-# weather data
-weather = pd.read_csv('data/Meteorological/datasets/final_data/final_augmented_weather_sentosa_data.csv')
-weather['Rain'] = weather['Daily Rainfall Total (mm)'].apply(lambda x: 1 if x > 0 else 0)
+def _clean_tourism(df):
+    df['year_month'] = pd.to_datetime(df['year_month'])
+    df['no_of_visitors'] = pd.to_numeric(df['no_of_visitors'], errors='coerce').fillna(0).astype(int)
+    return df
 
-# event data
-events = pd.read_csv('data/Events/EventData/supplementary_event_data_2016_2025.csv')
+def _clean_weather(df):
+    df['Rain'] = (df['Daily Rainfall Total (mm)'] > 0).astype(int)
+    return df
 
-# school holidays data
-school_holidays = pd.read_csv('data/Events/Holidays/datasets/daily_school_holidays_combined.csv')
+def _clean_ride_wait_times(df):
+    # convert to datetime
+    df['Date/Time'] = pd.to_datetime(df['Date/Time'], errors='coerce')
 
-# public holidays data
-public_holidays = pd.read_csv('data/Events/Holidays/datasets/final_merged_PH_2020_2025.csv')
+    # convert 'Wait Time' to integer, handling non-numeric values
+    df['Wait Time'] = pd.to_numeric(df['Wait Time'], errors='coerce').fillna(0).astype(int)
 
-# ride wait times data
-ride_wait_times = pd.read_csv('data/uss_ride_wait_times/all_ride_wait_times.csv')
+    # ensure 'Ride' is of type string
+    df['Ride'] = df['Ride'].astype(str)
 
-# convert to datetime
-ride_wait_times['Date/Time'] = pd.to_datetime(ride_wait_times['Date/Time'], errors='coerce')
+    # replace Puss In Boots’ Giant Journey with Puss In Boots' Giant Journey
+    df['Ride'] = df['Ride'].str.replace('Puss In Boots’ Giant Journey', 'Puss In Boots\' Giant Journey')
+    return df
 
-# convert 'Wait Time' to integer, handling non-numeric values
-ride_wait_times['Wait Time'] = pd.to_numeric(ride_wait_times['Wait Time'], errors='coerce').fillna(0).astype(int)
+# name -> (source CSV relative to the repository root, cleaning function)
+DATASETS = {
+    # tourism data
+    'tourism': ('data/singapore_tourism_data/Final/tourism_counts/tourism.csv', _clean_tourism),
+    # wait time data
+    'wait_time': ('data/uss_wait_times/cleaned_data_2022_2025/cleaned_2024_wait_times.csv', None),
+    # four day weather forecast data
+    'four_day_forecast': ('data/Meteorological/datasets/final_data/4_day_weather_forecasts.csv', None),
+    # weather data
+    'weather': ('data/Meteorological/datasets/final_data/final_augmented_weather_sentosa_data.csv', _clean_weather),
+    # event data
+    'events': ('data/Events/EventData/supplementary_event_data_2016_2025.csv', None),
+    # school holidays data
+    'school_holidays': ('data/Events/Holidays/datasets/daily_school_holidays_combined.csv', None),
+    # public holidays data
+    'public_holidays': ('data/Events/Holidays/datasets/final_merged_PH_2020_2025.csv', None),
+    # ride wait times data
+    'ride_wait_times': ('data/uss_ride_wait_times/all_ride_wait_times.csv', _clean_ride_wait_times),
+    # tourism age group data
+    'tourism_age': ('data/singapore_tourism_data/Final/tourism_counts/tourism_age_groups.csv', _clean_tourism),
+    # ride data
+    'rides': ('data/uss_attraction_details/rides.csv', None),
+}
 
-# ensure 'Ride' is of type string
-ride_wait_times['Ride'] = ride_wait_times['Ride'].astype(str)
+_loaded = {}
 
-# replace Puss In Boots’ Giant Journey with Puss In Boots' Giant Journey
-ride_wait_times['Ride'] = ride_wait_times['Ride'].str.replace('Puss In Boots’ Giant Journey', 'Puss In Boots\' Giant Journey')
+def cache_path(name):
+    source = os.path.join(ROOT_DIR, DATASETS[name][0])
+    stat = os.stat(source)
+    return os.path.join(CACHE_DIR, f"{name}_v{CACHE_VERSION}_{stat.st_size}_{stat.st_mtime_ns}.parquet")
 
-# tourism age group data
-tourism_age = pd.read_csv('data/singapore_tourism_data/Final/tourism_counts/tourism_age_groups.csv')
-tourism_age['year_month'] = pd.to_datetime(tourism_age['year_month'])
-tourism_age['no_of_visitors'] = pd.to_numeric(tourism_age['no_of_visitors'], errors='coerce').fillna(0).astype(int)
+def read_dataset(name):
+    """
+    Read and clean one table, from the Parquet cache when its source CSV is unchanged.
+    Always returns a fresh DataFrame; use load() or attribute access for the shared copy.
+    """
+    path = cache_path(name)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
 
-# ride data
-rides = pd.read_csv('data/uss_attraction_details/rides.csv')
\ No newline at end of file
+    source, clean = DATASETS[name]
+    df = pd.read_csv(os.path.join(ROOT_DIR, source))
+    if clean is not None:
+        df = clean(df)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for stale in glob.glob(os.path.join(CACHE_DIR, f"{name}_v*.parquet")):
+        if stale != path:
+            # another worker may have pruned it already
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(stale)
+    # per-process temporary file, since build_figures.py may load a table in several workers at once
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except (ImportError, ValueError, TypeError) as e:
+        # columns Parquet cannot store (e.g. mixed types) just mean the table is not cached
+        print(f"Could not cache {name}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+def load(name):
+    # one shared DataFrame per table per process, as with the old module-level variables
+    if name not in _loaded:
+        _loaded[name] = read_dataset(name)
+    return _loaded[name]
+
+def __getattr__(name):
+    # `data.weather` / `from data import weather` load the table on first access
+    if name in DATASETS:
+        return load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(DATASETS))
+
+if __name__ == '__main__':
+    # warm the cache for every table
+    for name in DATASETS:
+        print(f"{name}: {load(name).shape}")
@@ -0,0 +1,36 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Vectorised day classifiers shared by the analysis scripts.
+# Each function labels a whole column at once (np.select / str.contains) instead of a
+# row-wise apply, and the labels are returned as categoricals so grouping and plotting
+# the multi-year 5-minute ride table stays cheap.
+
+WEATHER_CATEGORIES = pd.CategoricalDtype(['Hot', 'Mild', 'Rainy'])
+DAY_TYPES = pd.CategoricalDtype(['Weekday', 'Weekend', 'School Holiday', 'Public Holiday'])
+
+# a forecast implies rain if it mentions any of these
+RAIN_KEYWORDS = ['showers', 'rain', 'thunder', 'thundery']
+RAIN_PATTERN = re.compile('|'.join(re.escape(k) for k in RAIN_KEYWORDS), re.IGNORECASE)
+
+def categorize_weather(df, rainfall_col='Daily Rainfall Total (mm)', max_temp_col='Maximum Temperature (°C)',
+                       rain_threshold=5, hot_threshold=32):
+    # Rainy if more than 5mm of rain, else Hot above 32°C, else Mild
+    labels = np.select(
+        [df[rainfall_col] > rain_threshold, df[max_temp_col] > hot_threshold],
+        ['Rainy', 'Hot'],
+        default='Mild'
+    )
+    return pd.Series(pd.Categorical(labels, dtype=WEATHER_CATEGORIES), index=df.index)
+
+def day_type(df, public_col='is_public_holiday', school_col='is_school_only_holiday', weekend_col='is_weekend'):
+    # from holiday / weekend flags already joined onto df; public holidays take precedence
+    # over school holidays, which take precedence over weekends
+    flags = [df[col].fillna(False).astype(bool) for col in [public_col, school_col, weekend_col]]
+    labels = np.select(flags, ['Public Holiday', 'School Holiday', 'Weekend'], default='Weekday')
+    return pd.Series(pd.Categorical(labels, dtype=DAY_TYPES), index=df.index)
+
+def is_rain_forecast(text):
+    # boolean Series, False for missing forecasts
+    return text.str.contains(RAIN_PATTERN, na=False).astype(bool)
@@ -5,7 +5,7 @@ import matplotlib.dates as mdates
 import matplotlib.patches as mpatches
 from matplotlib.patches import Rectangle
 import statsmodels.formula.api as smf
-from data import tourism, wait_time, four_day_forecast, weather, events, school_holidays, public_holidays, ride_wait_times, rides, tourism_age
+from data import wait_time, events
 
 # get events data
 events = events.copy()
@@ -5,12 +5,12 @@ import matplotlib.dates as mdates
 import matplotlib.patches as mpatches
 from matplotlib.patches import Rectangle
 import statsmodels.formula.api as smf
-from data import tourism, wait_time, four_day_forecast, weather, events, school_holidays, public_holidays, ride_wait_times, rides, tourism_age
+from data import tourism, wait_time, ride_wait_times, rides, tourism_age
 
 wait_time_month = wait_time.copy()
 # ensure that date is in datetime format
 wait_time_month['date'] = pd.to_datetime(wait_time['date'])
-wait_time_month['month'] = wait_time['date'].dt.month
+wait_time_month['month'] = wait_time_month['date'].dt.month
 
 # group by month and calculate the average wait time
 wait_time_month = wait_time_month.groupby('month')['wait_time'].mean().reset_index()
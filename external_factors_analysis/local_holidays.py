@@ -5,7 +5,8 @@ import matplotlib.dates as mdates
 import matplotlib.patches as mpatches
 from matplotlib.patches import Rectangle
 import statsmodels.formula.api as smf
-from data import tourism, wait_time, four_day_forecast, weather, events, school_holidays, public_holidays, ride_wait_times, rides, tourism_age
+from data import wait_time, school_holidays, public_holidays, ride_wait_times, rides
+from day_classifier import day_type
 
 # ensure both are datetime type
 school_holidays['date'] = pd.to_datetime(school_holidays['date'], format = "%d/%m/%Y")
@@ -42,18 +43,8 @@ daily_wait['is_weekend'] = daily_wait['day_of_week'].isin([5, 6])  # 5=Saturday,
 daily_wait['is_public_holiday'] = daily_wait['is_public_holiday'].fillna(False)
 daily_wait['is_school_only_holiday'] = daily_wait['is_school_only_holiday'].fillna(False)
 
-# day time logic
-def get_day_type(row):
-    if row['is_public_holiday']:
-        return 'Public Holiday'
-    elif row['is_school_only_holiday']:
-        return 'School Holiday'
-    elif row['is_weekend']:
-        return 'Weekend'
-    else:
-        return 'Weekday'
-
-daily_wait['day_type'] = daily_wait.apply(get_day_type, axis=1)
+# day type: public holiday > school holiday > weekend > weekday
+daily_wait['day_type'] = day_type(daily_wait)
 daily_wait = daily_wait.filter(['date', 'time', 'wait_time', 'day_type'])
 avg_daily_wait = daily_wait.groupby('date').agg({'wait_time': 'mean', 'day_type': 'first'}).reset_index()
 
@@ -77,7 +68,7 @@ plt.savefig('external_factors_analysis/local_holiday_figures/average_daily_wait_
 plt.show()
 
 # give the summary statistics of the wait time by day type
-summary_stats = avg_daily_wait.groupby('day_type')['wait_time'].describe()
+summary_stats = avg_daily_wait.groupby('day_type', observed=True)['wait_time'].describe()
 summary_stats = summary_stats.reset_index()
 print(summary_stats)
 
@@ -102,8 +93,8 @@ ride_daily_wait['is_weekend'] = ride_daily_wait['day_of_week'].isin([5, 6])  # 5
 ride_daily_wait['is_public_holiday'] = ride_daily_wait['is_public_holiday'].fillna(False)
 ride_daily_wait['is_school_only_holiday'] = ride_daily_wait['is_school_only_holiday'].fillna(False)
 
-# apply the get_day_type function
-ride_daily_wait['day_type'] = ride_daily_wait.apply(get_day_type, axis=1)
+# label day type
+ride_daily_wait['day_type'] = day_type(ride_daily_wait)
 ride_daily_wait = ride_daily_wait.filter(['Date/Time', 'Ride', 'Wait Time', 'day_type'])
 
 # get public holiday data
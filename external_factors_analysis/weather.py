@@ -5,7 +5,8 @@ import matplotlib.dates as mdates
 import matplotlib.patches as mpatches
 from matplotlib.patches import Rectangle
 import statsmodels.formula.api as smf
-from data import tourism, wait_time, four_day_forecast, weather, events, school_holidays, public_holidays, ride_wait_times, rides, tourism_age
+from data import wait_time, weather, ride_wait_times, rides
+from day_classifier import categorize_weather
 
 # ensure that date is in datetime format
 wait_time_details = wait_time.copy()
@@ -35,17 +36,8 @@ weather_2024 = weather_2024.filter(['Date', 'Daily Rainfall Total (mm)', 'Maximu
 merge_weather_wait_time = pd.merge(wait_time_details, weather_2024, left_on='date', right_on='Date', how='inner')
 merge_weather_wait_time = merge_weather_wait_time.drop(columns=['Date'])
 
-# function to classify weather 
-def categorize_weather(row):
-    if row['Daily Rainfall Total (mm)'] > 5:
-        return 'Rainy'
-    elif row['Maximum Temperature (°C)'] > 32:
-        return 'Hot'
-    else:
-        return 'Mild'
-
-# apply to column
-merge_weather_wait_time['weather_category'] = merge_weather_wait_time.apply(categorize_weather, axis=1)
+# classify weather
+merge_weather_wait_time['weather_category'] = categorize_weather(merge_weather_wait_time)
 
 # plot boxplot of wait types by weather
 plt.figure(figsize=(10, 6))
@@ -61,7 +53,7 @@ plt.savefig('external_factors_analysis/weather_figures/wait_time_by_weather.png'
 plt.show()
 
 # summary statistics for wait times by weather
-summary_stats = merge_weather_wait_time.groupby('weather_category')['avg_wait'].describe()
+summary_stats = merge_weather_wait_time.groupby('weather_category', observed=True)['avg_wait'].describe()
 summary_stats = summary_stats.reset_index()
 print(summary_stats)
 
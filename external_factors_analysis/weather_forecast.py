@@ -5,7 +5,8 @@ import matplotlib.dates as mdates
 import matplotlib.patches as mpatches
 from matplotlib.patches import Rectangle
 import statsmodels.formula.api as smf
-from data import tourism, wait_time, four_day_forecast, weather, events, school_holidays, public_holidays, ride_wait_times, rides, tourism_age
+from data import wait_time, four_day_forecast
+from day_classifier import is_rain_forecast
 
 # ensure forecast_date and record_date are in datetime format
 four_day_forecast['forecast_date'] = pd.to_datetime(four_day_forecast['forecast_date'])
@@ -58,17 +59,8 @@ daily_weather_wait = wait_times_weather.groupby(
     ['date', 'forecast_horizon', 'forecast_text']
 )['wait_time'].mean().reset_index()
 
-# define a function to detect if the forecast implies rain
-rain_keywords = ['showers', 'rain', 'thunder', 'thundery']
-
-def is_rain_forecast(text):
-    if pd.isna(text):
-        return False
-    text_lower = text.lower()
-    return any(keyword in text_lower for keyword in rain_keywords)
-
-# create a new boolean column for rain forecast
-daily_weather_wait['rain_forecast'] = daily_weather_wait['forecast_text'].apply(is_rain_forecast)
+# create a new boolean column for rain forecast (mentions showers, rain or thunder)
+daily_weather_wait['rain_forecast'] = is_rain_forecast(daily_weather_wait['forecast_text'])
 
 # plot boxplot of average daily wait times: Rain vs No Rain
 plt.figure(figsize=(10, 6))
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from forecast_cache import fit_keys
+from profile_cube import load_profile_cube
+from staff_optimiser import load_pred_data, forecast_wait_times, optimise_staffing, optimise_roster
+
+# Non-interactive version of staff_optimiser.main for a range of dates.
+# Park hours, staff budgets and priorities come from a JSON config (see
+# schedule_config.json): "defaults" apply to every date, "weekdays" override them by day
+# name and "dates" override them for single dates. Each date is forecast and optimised
+# in a worker process and the results are written as one hourly plan (CSV or Parquet).
+
+current_dir = os.path.dirname(__file__)
+DEFAULT_CONFIG = os.path.join(current_dir, "schedule_config.json")
+
+DEFAULT_PARAMS = {
+    'open_hour': 10,
+    'close_hour': 22,
+    'total_staff': 100,
+    'shift_hours': 8,
+    'wait_priority': 3,
+    'expected_change': 0,
+    'roster': False
+}
+
+def load_config(path=DEFAULT_CONFIG):
+    with open(path) as f:
+        return json.load(f)
+
+def day_params(config, date):
+    # defaults < weekday overrides < date overrides
+    params = {**DEFAULT_PARAMS, **config.get('defaults', {})}
+    params.update(config.get('weekdays', {}).get(date.day_name(), {}))
+    params.update(config.get('dates', {}).get(date.strftime("%Y-%m-%d"), {}))
+    return params
+
+_cube = None
+_df_pred = None
+
+def _init_worker(cube, df_pred):
+    # data is loaded once in the parent and shared with every worker
+    global _cube, _df_pred
+    _cube, _df_pred = cube, df_pred
+
+def schedule_day(date, params, cube=None, df_pred=None):
+    """
+    Forecast and allocate staff for one date. Returns one row per opening hour, or an
+    empty frame if there is no historical data for the date's month.
+    """
+    cube = _cube if cube is None else cube
+    df_pred = _df_pred if df_pred is None else df_pred
+    demand = forecast_wait_times(cube, df_pred, date, params['open_hour'], params['close_hour'])
+    if demand is None:
+        return pd.DataFrame()
+    demand['forecasted_wait_time'] *= 1 + params['expected_change'] / 100
+
+    if params['roster']:
+        result = optimise_roster(demand, params['total_staff'], params['wait_priority'], params['shift_hours'])
+    else:
+        result = optimise_staffing(demand, params['total_staff'], params['wait_priority'], params['shift_hours'])
+    demand['staff_allocation'] = result['staff_allocation']
+    demand.insert(0, 'date', date)
+    demand['status'] = result['status']
+    for key in ['total_staff', 'shift_hours', 'wait_priority', 'expected_change']:
+        demand[key] = params[key]
+    return demand
+
+def schedule_range(start_date, end_date, config=None, workers=None):
+    """
+    Staffing plan for every date from start_date to end_date (inclusive).
+    Returns a long frame with columns date, hour, forecasted_wait_time, staff_allocation,
+    status and the parameters used for each date.
+    """
+    config = config or {}
+    dates = pd.date_range(start_date, end_date, freq="D")
+    cube = load_profile_cube()
+    df_pred = load_pred_data()
+    params = {date: day_params(config, date) for date in dates}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(dates)))
+
+    # fit each distinct SARIMAX key once up front, so day workers only load cached fits
+    fit_keys(cube, [(date.month, date.weekday(), p['open_hour'], p['close_hour']) for date, p in params.items()], workers)
+
+    plans = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cube, df_pred)) as pool:
+        futures = {pool.submit(schedule_day, date, params[date]): date for date in dates}
+        for future in as_completed(futures):
+            date = futures[future]
+            try:
+                plans.append(future.result())
+            except Exception as e:
+                print(f"Failed to schedule {date:%Y-%m-%d}: {e}")
+
+    plans = [p for p in plans if not p.empty]
+    if not plans:
+        return pd.DataFrame()
+    return pd.concat(plans, ignore_index=True).sort_values(['date', 'hour']).reset_index(drop=True)
+
+def write_plan(plan, path):
+    # Parquet for .parquet paths, CSV otherwise
+    if path.endswith(".parquet"):
+        plan.to_parquet(path, index=False)
+    else:
+        plan.to_csv(path, index=False)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build a staffing plan for a range of dates")
+    parser.add_argument("start_date", help="first date to schedule (YYYY-MM-DD)")
+    parser.add_argument("end_date", help="last date to schedule (YYYY-MM-DD)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="JSON file of park hours, staff budgets and priorities")
+    parser.add_argument("--output", default="staffing_plan.csv", help="plan file (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plan = schedule_range(args.start_date, args.end_date, load_config(args.config), args.workers)
+    if plan.empty:
+        raise SystemExit("No dates could be scheduled.")
+    write_plan(plan, args.output)
+    print(f"Scheduled {plan['date'].nunique()} days in {time.perf_counter() - start:.1f}s; plan written to {args.output}")
@@ -0,0 +1,102 @@
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statsmodels.tsa.statespace.sarimax import SARIMAX, SARIMAXResults
+from profile_cube import load_profile_cube, hourly_profile
+
+# Disk cache of the SARIMAX fits used by staff_optimiser.forecast_wait_times.
+# A fit only depends on the target date's month and weekday, the opening hours and the
+# wait time data (via the profile cube), so it is stored under (month, weekday,
+# open_hour, close_hour, data fingerprint) and later requests only load it and call
+# get_forecast.
+# Run `python forecast_cache.py` to fit all 84 month x weekday keys in parallel.
+
+current_dir = os.path.dirname(__file__)
+CACHE_DIR = os.path.join(current_dir, "forecast_cache")
+CACHE_VERSION = 1
+
+def cache_path(month, weekday, open_hour, close_hour, fingerprint):
+    # the fingerprint is the hash of the wait time CSV, so a changed CSV never serves stale fits
+    return os.path.join(CACHE_DIR, f"v{CACHE_VERSION}-{fingerprint}", f"sarimax_m{month:02d}_wd{weekday}_{open_hour:02d}-{close_hour:02d}.pkl")
+
+def fit_sarimax(trends):
+    model = SARIMAX(trends['wait_time'], order=(1, 1, 1), seasonal_order=(1, 1, 1, 12))
+    return model.fit(disp=False)
+
+def get_fitted_sarimax(cube, month, weekday, open_hour, close_hour):
+    """
+    Fitted SARIMAX results for the key, loaded from the cache or fitted and saved.
+    Returns None when there is no historical data for the month.
+    """
+    path = cache_path(month, weekday, open_hour, close_hour, cube["fingerprint"])
+    if os.path.exists(path):
+        return SARIMAXResults.load(path)
+
+    # hourly means for the same month and weekday (or the whole month), see profile_cube.py
+    trends = hourly_profile(cube, month, weekday, open_hour, close_hour)
+    if trends.empty:
+        return None
+    results = fit_sarimax(trends)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # unique temporary file per writer, as several workers may fit the same key at once
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        results.save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return results
+
+_cube = None
+
+def _init_worker(cube):
+    global _cube
+    _cube = cube
+
+def _fit_one(month, weekday, open_hour, close_hour):
+    get_fitted_sarimax(_cube, month, weekday, open_hour, close_hour)
+    return month, weekday
+
+def fit_keys(cube, keys, workers=None):
+    """
+    Fit and cache the given (month, weekday, open_hour, close_hour) keys on a process pool,
+    each key once. Keys that are already cached are skipped. Returns the number of keys fitted.
+    """
+    keys = [
+        key for key in sorted(set(keys))
+        if not os.path.exists(cache_path(*key, cube["fingerprint"]))
+    ]
+    if not keys:
+        return 0
+    workers = max(1, min(workers or os.cpu_count() or 1, len(keys)))
+    print(f"Fitting {len(keys)} SARIMAX models on {workers} workers")
+    fitted = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cube,)) as pool:
+        futures = [pool.submit(_fit_one, *key) for key in keys]
+        for future in as_completed(futures):
+            try:
+                future.result()
+                fitted += 1
+            except Exception as e:
+                print(f"Failed to fit SARIMAX: {e}")
+    return fitted
+
+def precompute(cube, open_hour, close_hour, workers=None):
+    # every (month, weekday) key for the given opening hours
+    keys = [(month, weekday, open_hour, close_hour) for month in range(1, 13) for weekday in range(7)]
+    return fit_keys(cube, keys, workers)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute SARIMAX fits for every month and weekday")
+    parser.add_argument("--open-hour", type=int, default=10, help="park opening hour")
+    parser.add_argument("--close-hour", type=int, default=22, help="park closing hour")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    fitted = precompute(load_profile_cube(), args.open_hour, args.close_hour, args.workers)
+    print(f"Fitted {fitted} keys in {time.perf_counter() - start:.1f}s; cache at {CACHE_DIR}")
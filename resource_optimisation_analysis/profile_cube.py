@@ -0,0 +1,109 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+# Aggregate wait time profile of cleaned_2024_wait_times.csv, indexed by
+# month x weekday x hour x 5-minute slot, with the mean, quantiles and reading count of
+# every cell. It is built once, saved as wait_time_profile.npz and rebuilt only when the
+# CSV changes, so the optimiser and seasonality analysis index arrays instead of
+# re-parsing and re-grouping the CSV.
+
+current_dir = os.path.dirname(__file__)
+WAIT_FILE = os.path.join(current_dir, "..", "data", "uss_wait_times", "cleaned_data_2022_2025", "cleaned_2024_wait_times.csv")
+CUBE_PATH = os.path.join(current_dir, "wait_time_profile.npz")
+
+SHAPE = (12, 7, 24, 12)  # month (Jan=0), weekday (Mon=0), hour, 5-minute slot
+QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+STATS = ["mean", "q10", "q25", "q50", "q75", "q90"]
+
+_cube = None
+
+def file_fingerprint(path=WAIT_FILE):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def build_profile_cube(path=WAIT_FILE):
+    """
+    One pass over the wait time CSV. Returns a dict with
+    stats: float32 SHAPE + (len(STATS),) array (NaN where there are no readings),
+    count: int32 SHAPE array of readings per cell, fingerprint: hash of the CSV.
+    """
+    df = pd.read_csv(path, usecols=['date', 'time', 'wait_time'])
+    date = pd.to_datetime(df['date'], errors='coerce')
+    time = pd.to_datetime(df['time'], format="%H:%M:%S", errors='coerce')
+    valid = (date.notna() & time.notna() & df['wait_time'].notna()).to_numpy()
+    key = np.ravel_multi_index((
+        date.dt.month.to_numpy()[valid].astype(int) - 1,
+        date.dt.weekday.to_numpy()[valid].astype(int),
+        time.dt.hour.to_numpy()[valid].astype(int),
+        time.dt.minute.to_numpy()[valid].astype(int) // 5,
+    ), SHAPE)
+    grouped = pd.Series(df['wait_time'].to_numpy(dtype=float)[valid]).groupby(key)
+
+    cells = grouped.size()
+    stats = np.full((np.prod(SHAPE), len(STATS)), np.nan, dtype=np.float32)
+    count = np.zeros(np.prod(SHAPE), dtype=np.int32)
+    count[cells.index] = cells.to_numpy()
+    stats[cells.index, 0] = grouped.mean().to_numpy()
+    stats[cells.index, 1:] = grouped.quantile(QUANTILES).unstack().to_numpy()
+    return {
+        "stats": stats.reshape(SHAPE + (len(STATS),)),
+        "count": count.reshape(SHAPE),
+        "fingerprint": file_fingerprint(path),
+    }
+
+def load_profile_cube(rebuild=False):
+    # loaded once per process; rebuilt and re-saved when the CSV no longer matches
+    global _cube
+    fingerprint = file_fingerprint()
+    if _cube is not None and _cube["fingerprint"] == fingerprint and not rebuild:
+        return _cube
+    if os.path.exists(CUBE_PATH) and not rebuild:
+        with np.load(CUBE_PATH) as saved:
+            cube = {"stats": saved["stats"], "count": saved["count"], "fingerprint": str(saved["fingerprint"])}
+        if cube["fingerprint"] == fingerprint:
+            _cube = cube
+            return _cube
+    _cube = build_profile_cube()
+    np.savez(CUBE_PATH, stats=_cube["stats"], count=_cube["count"], fingerprint=np.array(_cube["fingerprint"]))
+    return _cube
+
+def _totals(cube, month=None, weekday=None):
+    # summed wait time and reading count per (hour, slot) over the selected months/weekdays
+    count = cube["count"].astype(float)
+    total = np.nan_to_num(cube["stats"][..., 0]) * count
+    index = (slice(None) if month is None else month - 1, slice(None) if weekday is None else weekday)
+    total, count = total[index], count[index]
+    while total.ndim > 2:
+        total, count = total.sum(axis=0), count.sum(axis=0)
+    return total, count
+
+def hourly_profile(cube, month, weekday, open_hour, close_hour):
+    """
+    Mean wait time per opening hour for the month and weekday, or for the whole month if
+    that weekday has no readings. Hours without readings are left out.
+    Returns a frame with columns hour, wait_time.
+    """
+    total, count = _totals(cube, month, weekday)
+    if count.sum() == 0:
+        total, count = _totals(cube, month)
+    hours = np.arange(open_hour, close_hour + 1)
+    total, count = total[hours].sum(axis=1), count[hours].sum(axis=1)
+    has_data = count > 0
+    return pd.DataFrame({'hour': hours[has_data], 'wait_time': total[has_data] / count[has_data]})
+
+def mean_wait(cube, month=None, weekday=None, hours=None):
+    # mean wait time over the selected months, weekdays and hours (NaN if no readings)
+    total, count = _totals(cube, month, weekday)
+    if hours is not None:
+        total, count = total[hours], count[hours]
+    return total.sum() / count.sum() if count.sum() else np.nan
+
+def slot_profile(cube, month, weekday, stat="mean"):
+    # (24, 12) hour x 5-minute slot profile of one statistic, e.g. "q90"
+    return cube["stats"][month - 1, weekday, :, :, STATS.index(stat)]
+
+if __name__ == '__main__':
+    cube = load_profile_cube(rebuild=True)
+    print(f"Saved {CUBE_PATH}: {int(cube['count'].sum())} readings in {int((cube['count'] > 0).sum())} cells")
@@ -2,37 +2,35 @@ import pandas as pd
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
+from profile_cube import load_profile_cube, mean_wait
 
-# Load the dataset
-data_path = os.path.join(os.path.dirname(__file__), "..", "data", "uss_wait_times", "cleaned_data_2022_2025", "cleaned_2024_wait_times.csv")
-df = pd.read_csv(data_path)
-
-# Parse datetime
-df['date'] = pd.to_datetime(df['date'], errors='coerce')
-df['parsed_time'] = pd.to_datetime(df['time'], format='%H:%M:%S', errors='coerce')
-df['datetime'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'])
-df['hour'] = df['parsed_time'].dt.hour
-df['minute'] = df['parsed_time'].dt.minute
+# Monthly and hourly averages come from the precomputed month x weekday x hour profile cube
+cube = load_profile_cube()
 
 # Monthly trend data
-df['month'] = df['date'].dt.month_name()
 month_order = ["January", "February", "March", "April", "May", "June", "July",
                "August", "September", "October", "November", "December"]
-df['month'] = pd.Categorical(df['month'], categories=month_order, ordered=True)
-monthly_trends = df.groupby('month')['wait_time'].mean().reset_index()
+monthly_trends = pd.DataFrame({
+    'month': pd.Categorical(month_order, categories=month_order, ordered=True),
+    'wait_time': [mean_wait(cube, month=m) for m in range(1, 13)]
+})
 
-# Normal hours mask: 10:00 to 18:55
-normal_mask = (
-    ((df['hour'] > 10) & (df['hour'] < 18)) |
-    ((df['hour'] == 10) & (df['minute'] >= 0)) |
-    ((df['hour'] == 18) & (df['minute'] <= 55))
-)
-df_normal_cleaned = df[normal_mask].copy()
+# Normal hours: 10:00 to 18:55
+hourly_normal = pd.DataFrame({
+    'hour': range(10, 19),
+    'wait_time': [mean_wait(cube, hours=[h]) for h in range(10, 19)]
+})
+
+# HHN nights depend on each date's closing time, so they still need the 5-minute readings
+data_path = os.path.join(os.path.dirname(__file__), "..", "data", "uss_wait_times", "cleaned_data_2022_2025", "cleaned_2024_wait_times.csv")
+df = pd.read_csv(data_path)
+df['date'] = pd.to_datetime(df['date'], errors='coerce')
+df['hour'] = pd.to_datetime(df['time'], format='%H:%M:%S', errors='coerce').dt.hour
 
 # Tag HHN dates
-open_close_times = df.groupby('date')['datetime'].agg(['min', 'max']).reset_index()
+open_close_times = df.groupby('date')['time'].agg(['min', 'max']).reset_index()
 open_close_times.columns = ['date', 'open_time', 'close_time']
-open_close_times['close_hour'] = open_close_times['close_time'].dt.strftime('%H:%M')
+open_close_times['close_hour'] = open_close_times['close_time'].str[:5]
 
 hhn_start = pd.to_datetime("2024-09-27")
 hhn_end = pd.to_datetime("2024-11-02")
@@ -40,11 +38,9 @@ open_close_times['is_hhn'] = (open_close_times['close_hour'] == '23:50') & \
                               (open_close_times['date'] >= hhn_start) & \
                               (open_close_times['date'] <= hhn_end)
 
-df_normal_cleaned = df_normal_cleaned.merge(open_close_times[['date', 'is_hhn']], on='date', how='left')
 df_hhn = df[(df['date'].isin(open_close_times[open_close_times['is_hhn']]['date'])) & (df['hour'] >= 19)]
 
 # Group by hour
-hourly_normal = df_normal_cleaned.groupby('hour')['wait_time'].mean().reset_index()
 hourly_hhn = df_hhn.groupby('hour')['wait_time'].mean().reset_index()
 
 # Monthly Plot
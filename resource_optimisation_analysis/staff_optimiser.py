@@ -1,50 +1,34 @@
 import pandas as pd
 import numpy as np
-import cvxpy as cp
 import os
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+from forecast_cache import get_fitted_sarimax
+from profile_cube import load_profile_cube, mean_wait
+from staffing_problem import solve_staffing, solve_batch_staffing, batch_demand_targets, solve_shift_roster
 
 # Step 1: Load Data (2023-2024)
-def load_data():
-    current_dir = os.path.dirname(__file__)
-    data_dir = os.path.join(current_dir, "..", "data", "uss_wait_times", "cleaned_data_2022_2025")
-    wait_file = os.path.join(data_dir, "cleaned_2024_wait_times.csv")  # Actual waiting times in 2024
+current_dir = os.path.dirname(__file__)
+data_dir = os.path.join(current_dir, "..", "data", "uss_wait_times", "cleaned_data_2022_2025")
+
+def load_pred_data():
     pred_file = os.path.join(data_dir, "cleaned_crowd_prediction_accuracy_table.csv")  # Forecasted vs actual for 2023-2024
-    df_wait = pd.read_csv(wait_file)
     df_pred = pd.read_csv(pred_file)
-    # Convert Date columns
-    df_wait['date'] = pd.to_datetime(df_wait['date'], errors='coerce')
     df_pred['Date'] = pd.to_datetime(df_pred['Date'], errors='coerce')
-    return df_wait, df_pred
+    return df_pred
 
 # Step 2: Compute Prediction Bias
 def compute_prediction_bias(df_pred):
     avg_bias = df_pred['Delta'].mean()
     return avg_bias
 
-# Step 3: Identify Matching Historical Dates using a broader historical window
-def get_historical_matches(df_wait, target_date):
-    target_month = target_date.month
-    target_weekday = target_date.weekday()  # Monday=0, Sunday=6
-    historical_matches = df_wait[(df_wait['date'].dt.month == target_month) & (df_wait['date'].dt.weekday == target_weekday)]
-    if historical_matches.empty:
-        historical_matches = df_wait[df_wait['date'].dt.month == target_month]
-    return historical_matches
-
-# Step 4: Forecast Future Waiting Times with Rolling Seasonal Adjustment
-def forecast_wait_times(df_wait, df_pred, target_date, open_hour, close_hour):
-    historical_matches = get_historical_matches(df_wait, target_date)
-    if historical_matches.empty:
+# Step 3: Forecast Future Waiting Times with Rolling Seasonal Adjustment
+# cube: month x weekday x hour profile of the 2024 wait times (profile_cube.load_profile_cube())
+def forecast_wait_times(cube, df_pred, target_date, open_hour, close_hour):
+    # fitted once per (month, weekday, opening hours, data) and cached on disk, see forecast_cache.py
+    results = get_fitted_sarimax(cube, target_date.month, target_date.weekday(), open_hour, close_hour)
+    if results is None:
         print("No relevant historical data found.")
         return None
 
-    historical_matches['hour'] = pd.to_datetime(historical_matches['time'], format="%H:%M:%S").dt.hour
-    hourly_trends = historical_matches[(historical_matches['hour'] >= open_hour) & (historical_matches['hour'] <= close_hour)]
-    hourly_trends = hourly_trends.groupby('hour')['wait_time'].mean().reset_index()
-
-    model = SARIMAX(hourly_trends['wait_time'], order=(1, 1, 1), seasonal_order=(1, 1, 1, 12))
-    results = model.fit(disp=False)
-    
     forecast_steps = close_hour - open_hour + 1
     future_wait_times = results.get_forecast(steps=forecast_steps)
     forecast_mean = future_wait_times.predicted_mean.values
@@ -52,8 +36,8 @@ def forecast_wait_times(df_wait, df_pred, target_date, open_hour, close_hour):
     avg_bias = compute_prediction_bias(df_pred)
     adjusted_forecast = forecast_mean + avg_bias
 
-    overall_mean = df_wait['wait_time'].mean()
-    month_mean = df_wait[df_wait['date'].dt.month == target_date.month]['wait_time'].mean()
+    overall_mean = mean_wait(cube)
+    month_mean = mean_wait(cube, month=target_date.month)
     seasonal_factor = month_mean / overall_mean if overall_mean != 0 else 1
     adjusted_forecast *= seasonal_factor
 
@@ -63,7 +47,7 @@ def forecast_wait_times(df_wait, df_pred, target_date, open_hour, close_hour):
     })
     return forecast_df
 
-# Step 5: User Input for Future Staff Allocation (with shift length)
+# Step 4: User Input for Future Staff Allocation (with shift length)
 def user_input():
     target_date_str = input("Enter the date to schedule for (YYYY-MM-DD): ")
     target_date = pd.to_datetime(target_date_str, errors='coerce')
@@ -84,58 +68,110 @@ def user_input():
         'wait_priority': wait_priority
     }
 
-# Step 6: Optimisation Model for Staff Allocation (with shift-hours constraint)
+# Step 5: Optimisation Model for Staff Allocation (with shift-hours constraint)
 def optimise_staffing(hourly_demand, total_staff, wait_priority, shift_hours):
     T = len(hourly_demand)
-    S = cp.Variable(T, nonneg=True)  # Staff allocated per time slot
-
     forecast = hourly_demand['forecasted_wait_time'].values
-    max_forecast = np.max(forecast)
-    demand_weights = forecast / max_forecast  
-    target = total_staff * demand_weights
-
-    c = 1    # Base cost per staff per hour
-    u = wait_priority * 10   # Under-allocation penalty weight
-    v = 5    # Over-allocation penalty weight
-
-    under_alloc = cp.sum(cp.square(cp.pos(target - S)))
-    over_alloc = cp.sum(cp.square(cp.pos(S - target)))
-    smoothness_penalty = cp.norm(S[1:] - S[:-1], p=2)
-    
-    objective = cp.Minimize(
-        c * cp.sum(S) + u * under_alloc + v * over_alloc + 0.1 * smoothness_penalty
-    )
-    min_staff = max(10, total_staff // T)
-    constraints = [
-        S >= min_staff,
-        S <= total_staff,
-        cp.sum(S) <= total_staff * shift_hours  # Total staff-hours constraint
-    ]
-    problem = cp.Problem(objective, constraints)
-    result = problem.solve()
-    if problem.status != "optimal":
+    # compiled once per horizon length and re-solved with warm start (see staffing_problem.py)
+    status, allocation = solve_staffing(forecast, total_staff, wait_priority, shift_hours)
+    if status != "optimal":
         print("Warning: Optimisation did not converge. Using equal distribution as fallback.")
         fallback_alloc = np.full(T, total_staff // T, dtype=int)
-        return {"status": problem.status, "staff_allocation": fallback_alloc}
+        return {"status": status, "staff_allocation": fallback_alloc}
     return {
-        'status': problem.status,
-        'staff_allocation': S.value
+        'status': status,
+        'staff_allocation': allocation
     }
 
-# Step 7: Main Function to run Optimisation
+# Step 5b: Batch Optimisation across Rides and Days (shared headcount)
+def hourly_ride_demand(ride_forecast, open_hour, close_hour):
+    # 5-minute ride forecasts (ride, datetime, PredictedWait) -> hourly demand per ride and day
+    df = ride_forecast.copy()
+    df['date'] = df['datetime'].dt.normalize()
+    df['hour'] = df['datetime'].dt.hour
+    df = df[(df['hour'] >= open_hour) & (df['hour'] <= close_hour)]
+    df = df.groupby(['ride', 'date', 'hour'])['PredictedWait'].mean().reset_index()
+    return df.rename(columns={'PredictedWait': 'forecasted_wait_time'})
+
+def optimise_staffing_batch(demand, total_staff, wait_priority, shift_hours):
+    """
+    Allocate staff to every ride and hour of one or more days in a single solve.
+    demand: long frame with columns ride, date, hour, forecasted_wait_time.
+    wait_priority: scalar, or a dict of ride -> priority.
+    Returns the demand frame with a staff_allocation column added.
+    """
+    matrix = demand.pivot_table(index='ride', columns=['date', 'hour'],
+                                values='forecasted_wait_time', aggfunc='mean').fillna(0)
+    rides = matrix.index.tolist()
+    day_of_slot = matrix.columns.get_level_values('date').to_numpy()
+    if isinstance(wait_priority, dict):
+        wait_priority = np.array([wait_priority.get(r, 3) for r in rides])
+
+    status, allocation = solve_batch_staffing(matrix.values, day_of_slot, total_staff, wait_priority, shift_hours)
+    if status != "optimal":
+        print("Warning: Batch optimisation did not converge. Using demand-proportional split as fallback.")
+        allocation = np.floor(batch_demand_targets(matrix.values, day_of_slot, total_staff))
+
+    alloc_df = pd.DataFrame(allocation, index=matrix.index, columns=matrix.columns)
+    alloc_df = alloc_df.stack(['date', 'hour']).rename('staff_allocation').reset_index()
+    result = demand.merge(alloc_df, on=['ride', 'date', 'hour'], how='left')
+    result.attrs['status'] = status
+    return result
+
+# Step 5c: Integer Shift Roster (MILP), falling back to the QP relaxation
+def optimise_roster(hourly_demand, total_staff, wait_priority, shift_hours, time_limit=10):
+    """
+    Integer number of staff starting a shift at each open hour, each shift covering
+    shift_hours consecutive hours. hourly_demand has columns hour, forecasted_wait_time
+    and optionally date (to roster several days at once).
+    """
+    demand = hourly_demand.reset_index(drop=True)
+    day_of_slot = demand['date'].to_numpy() if 'date' in demand.columns else np.zeros(len(demand))
+    status, shift_staff, starts, coverage = solve_shift_roster(
+        demand['forecasted_wait_time'].values, day_of_slot, total_staff, wait_priority, shift_hours, time_limit
+    )
+    if shift_staff is None:
+        print("Warning: No integer roster found in time. Falling back to the continuous allocation.")
+        allocations = []
+        for _, day_demand in demand.groupby(day_of_slot, sort=False):
+            result = optimise_staffing(day_demand, total_staff, wait_priority, shift_hours)
+            allocations.append(np.round(result['staff_allocation']).astype(int))
+        return {"status": status, "staff_allocation": np.concatenate(allocations), "shifts": None}
+
+    used = shift_staff > 0
+    shifts = pd.DataFrame({
+        'start_hour': demand['hour'].to_numpy()[starts[used]],
+        'end_hour': demand['hour'].to_numpy()[starts[used]] + coverage[:, used].sum(axis=0).astype(int),
+        'staff': shift_staff[used]
+    })
+    if 'date' in demand.columns:
+        shifts.insert(0, 'date', demand['date'].to_numpy()[starts[used]])
+    return {"status": status, "staff_allocation": coverage @ shift_staff, "shifts": shifts}
+
+# Step 6: Main Function to run Optimisation
 def main():
-    df_wait, df_pred = load_data()
+    df_pred = load_pred_data()
+    cube = load_profile_cube()
     user_params = user_input()
-    forecasted_demand = forecast_wait_times(df_wait, df_pred, user_params['target_date'],
+    forecasted_demand = forecast_wait_times(cube, df_pred, user_params['target_date'],
                                             user_params['open_hour'], user_params['close_hour'])
     if forecasted_demand is None:
         return
     adjustment_factor = 1 + (user_params['expected_change'] / 100)
     forecasted_demand['forecasted_wait_time'] *= adjustment_factor
-    result = optimise_staffing(forecasted_demand, user_params['total_staff'], 
-                               user_params['wait_priority'], user_params['shift_hours'])
+    roster = input("Build an integer shift roster? (y/n): ").strip().lower() == 'y'
+    if roster:
+        result = optimise_roster(forecasted_demand, user_params['total_staff'],
+                                 user_params['wait_priority'], user_params['shift_hours'])
+    else:
+        result = optimise_staffing(forecasted_demand, user_params['total_staff'], 
+                                   user_params['wait_priority'], user_params['shift_hours'])
     print("\n=== OPTIMISATION RESULTS ===")
     print("Status:", result['status'])
+    if roster and result['shifts'] is not None:
+        print("\nShift Start | Shift End | Staff")
+        for _, shift in result['shifts'].iterrows():
+            print(f"{shift['start_hour']:11d} | {shift['end_hour']:9d} | {shift['staff']:5d}")
     print("\nHour | Forecasted Wait Time | Staff Allocated")
     for i, hr in enumerate(forecasted_demand['hour']):
         print(f"{hr:4d} | {forecasted_demand.iloc[i]['forecasted_wait_time']:16.2f} | {round(result['staff_allocation'][i]):11d}")
@@ -0,0 +1,206 @@
+import threading
+import numpy as np
+import cvxpy as cp
+
+# Compiled staff allocation problem shared by staff_optimiser.py and app.py.
+# The problem is built once per horizon length T with cp.Parameter inputs (target demand,
+# staff total, wait priority, shift hours) and re-solved with warm start, so what-if
+# changes only update parameter values instead of re-canonicalising a new cp.Problem.
+# Problems are shared by every Streamlit session and thread, so each solve holds its
+# problem's lock from setting the parameters until the result has been copied out.
+
+c = 1    # Base cost per staff per hour
+v = 5    # Over-allocation penalty weight
+
+def demand_targets(forecast, total_staff):
+    # Staff target per hour, proportional to the forecasted wait time
+    forecast = np.asarray(forecast, dtype=float)
+    max_forecast = np.max(forecast) if len(forecast) and np.max(forecast) != 0 else 1
+    return total_staff * forecast / max_forecast
+
+class StaffingProblem:
+    def __init__(self, T):
+        self.T = T
+        self.lock = threading.Lock()
+        self.S = cp.Variable(T, nonneg=True)  # Staff allocated per time slot
+
+        self.target = cp.Parameter(T, name="target")
+        # Under-allocation is weighted by u = wait_priority * 10. To stay DPP the weight
+        # enters as sqrt(u), with sqrt(u) * target passed as its own parameter.
+        self.sqrt_u = cp.Parameter(nonneg=True, name="sqrt_u")
+        self.sqrt_u_target = cp.Parameter(T, name="sqrt_u_target")
+        self.min_staff = cp.Parameter(nonneg=True, name="min_staff")
+        self.total_staff = cp.Parameter(nonneg=True, name="total_staff")
+        self.staff_hours = cp.Parameter(nonneg=True, name="staff_hours")
+
+        S = self.S
+        under_alloc = cp.sum(cp.square(cp.pos(self.sqrt_u_target - self.sqrt_u * S)))
+        over_alloc = cp.sum(cp.square(cp.pos(S - self.target)))
+        objective = c * cp.sum(S) + under_alloc + v * over_alloc
+        if T > 1:
+            smoothness_penalty = cp.norm(S[1:] - S[:-1], p=2)
+            objective = objective + 0.1 * smoothness_penalty
+
+        constraints = [
+            S >= self.min_staff,
+            S <= self.total_staff,
+            cp.sum(S) <= self.staff_hours  # Total staff-hours constraint
+        ]
+        self.problem = cp.Problem(cp.Minimize(objective), constraints)
+
+    def solve(self, forecast, total_staff, wait_priority, shift_hours):
+        """
+        Set the parameters and re-solve. Returns (status, staff allocation or None).
+        """
+        target = demand_targets(forecast, total_staff)
+        sqrt_u = np.sqrt(wait_priority * 10)
+        with self.lock:
+            self.target.value = target
+            self.sqrt_u.value = sqrt_u
+            self.sqrt_u_target.value = sqrt_u * target
+            self.min_staff.value = max(10, total_staff // self.T)
+            self.total_staff.value = total_staff
+            self.staff_hours.value = total_staff * shift_hours
+            try:
+                self.problem.solve(warm_start=True)
+            except cp.error.SolverError:
+                return "solver_error", None
+            allocation = None if self.S.value is None else self.S.value.copy()
+            return self.problem.status, allocation
+
+# one compiled problem per horizon length, reused across calls (and Streamlit reruns)
+_problems = {}
+_problems_lock = threading.Lock()
+
+def get_staffing_problem(T):
+    with _problems_lock:
+        if T not in _problems:
+            _problems[T] = StaffingProblem(T)
+        return _problems[T]
+
+def solve_staffing(forecast, total_staff, wait_priority, shift_hours):
+    return get_staffing_problem(len(forecast)).solve(forecast, total_staff, wait_priority, shift_hours)
+
+def batch_demand_targets(demand, day_of_slot, total_staff):
+    """
+    Staff target per ride and hour: each day's peak hour gets the full headcount, split
+    between rides in proportion to their forecasted wait times.
+    """
+    demand = np.asarray(demand, dtype=float)
+    hour_totals = demand.sum(axis=0)
+    targets = np.zeros_like(demand)
+    for day in np.unique(day_of_slot):
+        cols = day_of_slot == day
+        peak = hour_totals[cols].max()
+        targets[:, cols] = total_staff * demand[:, cols] / (peak if peak != 0 else 1)
+    return targets
+
+def solve_batch_staffing(demand, day_of_slot, total_staff, wait_priority, shift_hours, min_staff_per_ride=1):
+    """
+    Allocate staff to every ride and hour in one convex program.
+    demand: (rides, slots) forecasted wait times, slots being consecutive open hours of
+    one or more days; day_of_slot: (slots,) day label of each slot.
+    wait_priority: scalar or one value per ride.
+    Headcount is shared: in every hour the rides together use at most total_staff, and
+    each day's staff-hours are capped at total_staff * shift_hours.
+    Returns (status, (rides, slots) allocation or None).
+    """
+    demand = np.asarray(demand, dtype=float)
+    day_of_slot = np.asarray(day_of_slot)
+    R, T = demand.shape
+    target = batch_demand_targets(demand, day_of_slot, total_staff)
+    u = np.broadcast_to(np.asarray(wait_priority, dtype=float) * 10, (R,)).reshape(R, 1)
+    min_staff = min(min_staff_per_ride, total_staff // R)
+
+    S = cp.Variable((R, T), nonneg=True)
+    under_alloc = cp.sum(cp.multiply(u, cp.square(cp.pos(target - S))))
+    over_alloc = cp.sum(cp.square(cp.pos(S - target)))
+    objective = c * cp.sum(S) + under_alloc + v * over_alloc
+    if T > 1:
+        # only penalise hour-to-hour changes within the same day
+        same_day = (day_of_slot[1:] == day_of_slot[:-1]).astype(float)
+        smoothness_penalty = cp.norm(cp.multiply(np.tile(same_day, (R, 1)), S[:, 1:] - S[:, :-1]), "fro")
+        objective = objective + 0.1 * smoothness_penalty
+
+    hourly_staff = cp.sum(S, axis=0)
+    day_matrix = (np.unique(day_of_slot)[:, None] == day_of_slot[None, :]).astype(float)  # (days, slots)
+    constraints = [
+        S >= min_staff,
+        hourly_staff <= total_staff,  # shared headcount in every hour
+        day_matrix @ hourly_staff <= total_staff * shift_hours  # Total staff-hours constraint, per day
+    ]
+
+    problem = cp.Problem(cp.Minimize(objective), constraints)
+    try:
+        problem.solve()
+    except cp.error.SolverError:
+        return "solver_error", None
+    return problem.status, S.value
+
+# MILP solvers usable offline through cvxpy, in order of preference, with their time limit option
+MILP_SOLVERS = {
+    "HIGHS": lambda seconds: {"time_limit": seconds},
+    "SCIPY": lambda seconds: {"scipy_options": {"time_limit": seconds}},
+    "GLPK_MI": lambda seconds: {"glpk": {"tm_lim": int(seconds * 1000), "msg_lev": "GLP_MSG_OFF"}},
+}
+
+def shift_coverage(day_of_slot, shift_hours):
+    """
+    Candidate shifts and the hours they cover. A shift starts at any open hour of a day
+    and covers shift_hours consecutive hours of that day (the whole day if it is shorter).
+    Returns (coverage (slots, shifts) 0/1 matrix, start slot of each shift).
+    """
+    day_of_slot = np.asarray(day_of_slot)
+    columns, starts = [], []
+    for day in np.unique(day_of_slot):
+        slots = np.flatnonzero(day_of_slot == day)
+        length = min(shift_hours, len(slots))
+        for first in range(len(slots) - length + 1):
+            column = np.zeros(len(day_of_slot))
+            column[slots[first:first + length]] = 1
+            columns.append(column)
+            starts.append(slots[first])
+    return np.column_stack(columns), np.array(starts)
+
+def solve_shift_roster(forecast, day_of_slot, total_staff, wait_priority, shift_hours, time_limit=10):
+    """
+    Choose integer numbers of staff for each shift start time so hourly coverage follows
+    the demand targets. Each staff member works one shift per day, so at most total_staff
+    shifts are used per day. Penalties are linear versions of the QP's (c, u, v) weights.
+    Returns (status, staff per shift or None, start slot per shift, coverage matrix).
+    """
+    forecast = np.asarray(forecast, dtype=float)
+    day_of_slot = np.asarray(day_of_slot)
+    coverage, starts = shift_coverage(day_of_slot, shift_hours)
+    target = batch_demand_targets(forecast[None, :], day_of_slot, total_staff)[0]
+    u = wait_priority * 10
+    min_staff = min(max(10, total_staff // len(forecast)), total_staff)
+
+    x = cp.Variable(coverage.shape[1], integer=True)
+    under = cp.Variable(len(forecast), nonneg=True)
+    over = cp.Variable(len(forecast), nonneg=True)
+    staff = coverage @ x
+    day_of_shift = day_of_slot[starts]
+    shift_days = (np.unique(day_of_slot)[:, None] == day_of_shift[None, :]).astype(float)  # (days, shifts)
+
+    constraints = [
+        x >= 0,
+        staff >= min_staff,
+        shift_days @ x <= total_staff,
+        under >= target - staff,
+        over >= staff - target,
+    ]
+    problem = cp.Problem(cp.Minimize(c * cp.sum(staff) + u * cp.sum(under) + v * cp.sum(over)), constraints)
+
+    installed = cp.installed_solvers()
+    for solver, options in MILP_SOLVERS.items():
+        if solver not in installed:
+            continue
+        try:
+            problem.solve(solver=solver, **options(time_limit))
+        except Exception as e:
+            print(f"MILP solver {solver} failed: {e}")
+            continue
+        if x.value is not None:
+            return problem.status, np.round(x.value).astype(int), starts, coverage
+    return "no_milp_solution", None, starts, coverage
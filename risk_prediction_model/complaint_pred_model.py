@@ -1,9 +1,10 @@
+import os
+import sys
 import pandas as pd
 import re
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 #nltk.download('vader_lexicon')
 #nltk.download('wordnet')
 #nltk.download('stopwords')
@@ -18,6 +19,8 @@ from sklearn.metrics import accuracy_score, classification_report
 from sklearn.tree import DecisionTreeClassifier
 import datetime
 from sklearn.feature_extraction.text import CountVectorizer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sentiment_analysis"))
+from sentiment_scorer import compound_scores
 
 
 # Import Google Reviews and Trip Advisor data
@@ -64,13 +67,8 @@ df['is_english_speaker'] = df['original_language'].apply(lambda x: 1 if x == 'en
 df['visited_on'] = df['visited_on'].apply(lambda x: 0 if x == 'Weekday' else 1)
 df['rating'] = pd.to_numeric(df['rating'])
 
-sid = SentimentIntensityAnalyzer()
-
-def get_sentiment(text):
-    sentiment = sid.polarity_scores(text)
-    return sentiment['compound']  # The compound score indicates overall sentiment
-
-df['sentiment'] = df['review_text'].apply(get_sentiment)
+# VADER compound score, batched and cached across runs
+df['sentiment'] = compound_scores(df['review_text'].fillna('').tolist())
 df['sentiment_label'] = df['sentiment'].apply(lambda x: 'positive' if x >= 0.05 else ('negative' if x <= -0.05 else 'neutral'))
 df['sentiment_label'].value_counts()
 
@@ -227,7 +225,7 @@ def process_guest_data(new_data, type):
 
     processed_df['is_english_speaker'] = processed_df['original_language'].apply(lambda x: 1 if x == 'en' else 0)
 
-    processed_df['sentiment'] = processed_df['review_text'].apply(get_sentiment)
+    processed_df['sentiment'] = compound_scores(processed_df['review_text'].fillna('').tolist())
     
     # Create feature for review length
     processed_df['review_length'] = processed_df['review_text'].apply(lambda x: len(str(x).split()) if isinstance(x, str) else 0)
@@ -225,15 +225,11 @@ plt.show()
 import nltk
 #nltk.download('vader_lexicon')
 
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-sid = SentimentIntensityAnalyzer()
+from sentiment_scorer import compound_scores
 
 
-def get_sentiment(text):
-    sentiment = sid.polarity_scores(text)
-    return sentiment['compound']  # The compound score indicates overall sentiment
-
-df['Sentiment'] = df['Clean Review Text'].apply(get_sentiment)
+# The compound score indicates overall sentiment; reviews scored on earlier runs are read from the cache
+df['Sentiment'] = compound_scores(df['Clean Review Text'].fillna('').tolist())
 df['Sentiment_Label'] = df['Sentiment'].apply(lambda x: 'positive' if x > 0.05 else ('negative' if x < -0.05 else 'neutral'))
 df['Sentiment_Label'].value_counts()
 
@@ -0,0 +1,121 @@
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from itertools import repeat
+
+# Shared VADER scoring for reviews and comments.
+# Texts are scored in batches (across a process pool for large corpora) and every score is
+# stored in a SQLite cache keyed by a hash of the analyser and the text, so reviews and
+# comments that were scored on a previous run are read back instead of rescored.
+# "nltk" uses nltk.sentiment.vader (needs nltk.download('vader_lexicon')); "vaderSentiment"
+# uses the vaderSentiment package. The two lexicons differ slightly, so they are cached apart.
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentiment_cache.sqlite")
+BACKENDS = ("nltk", "vaderSentiment")
+SCORE_KEYS = ("neg", "neu", "pos", "compound")
+
+BATCH_SIZE = 500
+# below this many unscored texts the pool's start-up cost outweighs the speed-up
+MIN_PARALLEL = 2000
+# SQLite's default limit on bound parameters per statement
+SQL_CHUNK = 900
+
+_analysers = {}
+
+def get_analyser(backend):
+    # one analyser per backend per process (loading the lexicon is the expensive part)
+    if backend not in _analysers:
+        if backend == "nltk":
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        elif backend == "vaderSentiment":
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        else:
+            raise ValueError(f"Unknown sentiment backend {backend!r}, expected one of {BACKENDS}")
+        _analysers[backend] = SentimentIntensityAnalyzer()
+    return _analysers[backend]
+
+def text_key(text, backend):
+    if isinstance(text, list):
+        text = "\0list\0" + "\0".join(text)
+    return hashlib.sha256(f"{backend}\0{text}".encode("utf-8")).hexdigest()
+
+def _is_text(text, backend):
+    # a string, or (vaderSentiment only) a list of strings, which the analyser scores as
+    # the concatenated items, translating only items that are a single emoji
+    if isinstance(text, str):
+        return True
+    return backend == "vaderSentiment" and isinstance(text, list) and all(isinstance(t, str) for t in text)
+
+def score_batch(texts, backend):
+    analyser = get_analyser(backend)
+    return [analyser.polarity_scores(text) for text in texts]
+
+def _connect(cache_path):
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scores "
+        "(key TEXT PRIMARY KEY, neg REAL, neu REAL, pos REAL, compound REAL)"
+    )
+    return conn
+
+def _read_cached(conn, keys):
+    cached = {}
+    for i in range(0, len(keys), SQL_CHUNK):
+        chunk = keys[i:i + SQL_CHUNK]
+        rows = conn.execute(
+            f"SELECT key, neg, neu, pos, compound FROM scores WHERE key IN ({','.join('?' * len(chunk))})",
+            chunk
+        )
+        for key, *values in rows:
+            cached[key] = dict(zip(SCORE_KEYS, values))
+    return cached
+
+def _score(texts, backend, workers, batch_size):
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(batches)))
+    if workers == 1 or len(texts) < MIN_PARALLEL:
+        return [score for batch in batches for score in score_batch(batch, backend)]
+    # fork where available: the calling scripts run at module level without a __main__
+    # guard, which spawned workers would re-execute
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return [score for batch in pool.map(score_batch, batches, repeat(backend)) for score in batch]
+
+def polarity_scores(texts, backend="nltk", workers=None, cache_path=CACHE_PATH, batch_size=BATCH_SIZE):
+    """
+    VADER scores ({neg, neu, pos, compound}) for every text, in the same order as `texts`.
+    Texts already in the cache are not rescored; duplicates are scored once.
+    Pass cache_path=None to score without the cache. Missing texts must be dropped or
+    filled (e.g. fillna('')) by the caller rather than scored as "nan". With the
+    vaderSentiment backend a text may also be a list of strings, as in the Instagram export.
+    """
+    texts = list(texts)
+    invalid = [text for text in texts if not _is_text(text, backend)]
+    if invalid:
+        raise TypeError(f"{len(invalid)} texts are not strings (e.g. {invalid[0]!r}); drop or fillna('') them first")
+    keys = [text_key(text, backend) for text in texts]
+    unique = dict(zip(keys, texts))
+
+    if cache_path is None:
+        scores = dict(zip(unique, _score(list(unique.values()), backend, workers, batch_size)))
+        return [scores[key] for key in keys]
+
+    with closing(_connect(cache_path)) as conn:
+        scores = _read_cached(conn, list(unique))
+        missing = [key for key in unique if key not in scores]
+        if missing:
+            new_scores = _score([unique[key] for key in missing], backend, workers, batch_size)
+            scores.update(zip(missing, new_scores))
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+                    [(key, *(score[k] for k in SCORE_KEYS)) for key, score in zip(missing, new_scores)]
+                )
+    return [scores[key] for key in keys]
+
+def compound_scores(texts, **kwargs):
+    # the compound score summarises overall sentiment in [-1, 1]
+    return [score["compound"] for score in polarity_scores(texts, **kwargs)]